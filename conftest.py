@@ -0,0 +1 @@
+pytest_plugins = ["pytest_ollama_load"]
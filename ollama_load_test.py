@@ -1,4 +1,5 @@
 import requests
+import urllib3
 import multiprocessing
 import time
 import random
@@ -7,13 +8,181 @@ import signal
 import json
 import psutil
 import threading
+import os
+import sys
+import html
+import itertools
+import math
+import hashlib
+import bisect
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List
+from collections import deque
+from array import array
+
+class LatencyHistogram:
+    """Histogramm mit logarithmischen Buckets für Latenzen in Sekunden
+    
+    Konstanter Speicher unabhängig von der Anzahl Requests; Perzentile sind
+    auf etwa 12 % genau (20 Buckets pro Dekade). Histogramme lassen sich
+    zusammenführen und kompakt (nur belegte Buckets) serialisieren.
+    """
+    BUCKETS_PER_DECADE = 20
+    MIN_VALUE = 0.001
+    DECADES = 7  # 1 ms bis 10000 s
+    
+    def __init__(self):
+        self.counts = [0] * (self.BUCKETS_PER_DECADE * self.DECADES + 2)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+    
+    def _index(self, value):
+        if value < self.MIN_VALUE:
+            return 0
+        index = int(math.log10(value / self.MIN_VALUE) * self.BUCKETS_PER_DECADE) + 1
+        return min(index, len(self.counts) - 1)
+    
+    def upper_edge(self, index):
+        """Obere Grenze eines Buckets in Sekunden"""
+        return self.MIN_VALUE * 10 ** (index / self.BUCKETS_PER_DECADE)
+    
+    def add(self, value, count=1):
+        self.counts[self._index(value)] += count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+    
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+    
+    def mean(self):
+        return self.total / self.count if self.count else 0
+    
+    def percentile(self, pct):
+        if not self.count:
+            return 0
+        rank = self.count * pct / 100
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if count and cumulative >= rank:
+                return min(max(self.upper_edge(index), self.min), self.max)
+        return self.max
+    
+    def cdf(self):
+        """Liste von (Obergrenze, kumulativer Anteil) für alle belegten Buckets"""
+        points = []
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                cumulative += count
+                points.append((min(self.upper_edge(index), self.max), cumulative / self.count))
+        return points
+    
+    def to_dict(self):
+        return {
+            "count": self.count, "total": self.total, "min": self.min, "max": self.max,
+            "buckets": {index: count for index, count in enumerate(self.counts) if count}
+        }
+    
+    @classmethod
+    def from_values(cls, values):
+        histogram = cls()
+        for value in values:
+            histogram.add(value)
+        return histogram
+
+class PromptStats:
+    """Kennzahlen pro Prompt-Index eines Schritts in kompakten Arrays
+    
+    Zähler und Summen liegen als array-Spalten vor (ein Eintrag pro Prompt),
+    TTFT und Antwortzeiten als float32-Arrays pro Prompt für exakte Perzentile.
+    Persona-Prompts werden über ihren Text auf den Index im Haupt-Corpus
+    abgebildet bzw. hinten angehängt. Events werden während des Laufs
+    blockweise eingearbeitet (LiveConsole.on_events).
+    """
+    def __init__(self, prompts, personas=None):
+        self.prompts = list(prompts)
+        positions = {}
+        for index, text in enumerate(self.prompts):
+            positions.setdefault(text, index)
+        # Übersetzung lokaler Indizes (pro Persona) auf den gemeinsamen Katalog
+        self.translation = {"": array('l', range(len(self.prompts)))}
+        for persona in personas or []:
+            mapped = array('l')
+            for text in persona.prompts:
+                if text not in positions:
+                    positions[text] = len(self.prompts)
+                    self.prompts.append(text)
+                mapped.append(positions[text])
+            self.translation[persona.name] = mapped
+        
+        size = len(self.prompts)
+        self.counts = array('l', [0]) * size
+        self.errors = array('l', [0]) * size
+        self.tokens = array('d', [0.0]) * size
+        self.ttft = [array('f') for _ in range(size)]
+        self.response = [array('f') for _ in range(size)]
+    
+    def add_events(self, events):
+        for start, end, ttft, error_class, tokens, persona_name, user_id, prompt_index in events:
+            if prompt_index < 0:
+                continue
+            index = self.translation[persona_name][prompt_index]
+            self.counts[index] += 1
+            if error_class:
+                self.errors[index] += 1
+            else:
+                self.tokens[index] += tokens
+                self.ttft[index].append(ttft)
+                self.response[index].append(end - start)
+    
+    def summary(self, index):
+        """Kennzahlen eines Prompts; cv = Variationskoeffizient der Antwortzeit"""
+        response = self.response[index]
+        successful = len(response)
+        mean = sum(response) / successful if successful else 0
+        variance = sum((value - mean) ** 2 for value in response) / (successful - 1) if successful > 1 else 0
+        return {
+            "index": index,
+            "prompt": self.prompts[index],
+            "requests": self.counts[index],
+            "errors": self.errors[index],
+            "p50_ttft": percentile(self.ttft[index], 50),
+            "p95_ttft": percentile(self.ttft[index], 95),
+            "p50_response_time": percentile(response, 50),
+            "p95_response_time": percentile(response, 95),
+            "avg_tokens": self.tokens[index] / successful if successful else 0,
+            "cv": math.sqrt(variance) / mean if mean else 0
+        }
+    
+    def summaries(self):
+        return [self.summary(index) for index in range(len(self.prompts)) if self.counts[index]]
+    
+    def slowest(self, top_n):
+        """Prompts mit der höchsten P95-Antwortzeit"""
+        candidates = [entry for entry in self.summaries() if len(self.response[entry["index"]])]
+        return sorted(candidates, key=lambda entry: entry["p95_response_time"], reverse=True)[:top_n]
+    
+    def most_variable(self, top_n, min_samples=3):
+        """Prompts mit dem höchsten Variationskoeffizienten (mindestens min_samples Erfolge)"""
+        candidates = [entry for entry in self.summaries() if len(self.response[entry["index"]]) >= min_samples]
+        return sorted(candidates, key=lambda entry: entry["cv"], reverse=True)[:top_n]
 
 @dataclass
 class TestResult:
     """Datenklasse für Testergebnisse"""
+    __test__ = False  # Keine Testklasse für pytest
     users: int
     model: str
     gpu: str
@@ -29,6 +198,37 @@ class TestResult:
     memory_usage: float
     test_duration: float
     recommendation: str
+    tokens_per_second: float = 0.0
+    params: dict = field(default_factory=dict)
+    workload: str = "generate"
+    p50_response_time: float = 0.0
+    p95_response_time: float = 0.0
+    p99_response_time: float = 0.0
+    batch_size: int = 1
+    docs_per_second: float = 0.0
+    queue_p50: float = 0.0
+    queue_p95: float = 0.0
+    load_p50: float = 0.0
+    load_p95: float = 0.0
+    prompt_eval_p50: float = 0.0
+    prompt_eval_p95: float = 0.0
+    eval_p50: float = 0.0
+    eval_p95: float = 0.0
+    effective_parallelism: float = 0.0
+    avg_service_time: float = 0.0
+    avg_queue_time: float = 0.0
+    system_stats: dict = field(default_factory=dict)
+    ttft_histogram: LatencyHistogram = None
+    latency_histogram: LatencyHistogram = None
+    error_breakdown: dict = field(default_factory=dict)
+    error_rates: dict = field(default_factory=dict)
+    timeline: list = field(default_factory=list)
+    persona_stats: dict = field(default_factory=dict)
+    prefix_stats: dict = field(default_factory=dict)
+    prompt_stats: PromptStats = None
+    aborted: str = ""
+    abandoned_requests: int = 0
+    abandon_stats: dict = field(default_factory=dict)
 
 class ResultCollector:
     """Sammelt und verwaltet Testergebnisse"""
@@ -44,54 +244,215 @@ class ResultCollector:
         with self.lock:
             return self.results.copy()
 
+@dataclass
+class SystemSample:
+    """Ein Messpunkt des SystemMonitors (Raten pro Sekunde seit dem vorherigen Sample)"""
+    timestamp: float
+    cpu: float
+    cpu_per_core: tuple
+    memory: float
+    swap: float
+    net_rx_mb_s: float
+    net_tx_mb_s: float
+    net_rx_pkts_s: float
+    net_tx_pkts_s: float
+    ctx_switches_s: float
+
+# Kennzahlen, die pro Schritt als Min/P95/Max ausgewertet werden
+SYSTEM_METRICS = ("cpu", "cpu_core_max", "memory", "swap", "net_rx_mb_s", "net_tx_mb_s",
+                  "net_rx_pkts_s", "net_tx_pkts_s", "ctx_switches_s")
+
 class SystemMonitor:
-    """Überwacht Systemressourcen während des Tests"""
-    def __init__(self):
-        self.cpu_samples = []
-        self.memory_samples = []
+    """Überwacht Systemressourcen während des Tests
+    
+    Sampelt im konfigurierbaren Intervall über nicht-blockierende Deltas
+    (psutil.cpu_percent(interval=None), Zählerdifferenzen) und hält die
+    Samples in einem Ringpuffer fester Größe. Zeitstempel nutzen time.time(),
+    dieselbe Uhr wie die Request-Events.
+    """
+    def __init__(self, interval=1.0, buffer_size=20000):
+        self.interval = interval
+        self.samples = deque(maxlen=buffer_size)
         self.monitoring = False
         self.monitor_thread = None
+        self.error_count = 0
+        self.last_error = None
         
     def start_monitoring(self):
         self.monitoring = True
-        self.cpu_samples = []
-        self.memory_samples = []
+        self.samples.clear()
+        self.error_count = 0
+        self.last_error = None
         self.monitor_thread = threading.Thread(target=self._monitor_loop)
         self.monitor_thread.daemon = True
         self.monitor_thread.start()
         
-    def stop_monitoring(self):
+    def stop_monitoring(self, verbose=True):
         self.monitoring = False
         if self.monitor_thread:
-            self.monitor_thread.join(timeout=2)
+            self.monitor_thread.join(timeout=max(2, self.interval * 2))
+        if self.error_count and verbose:
+            print(f"⚠️ SystemMonitor: {self.error_count} fehlgeschlagene Samples (zuletzt: {self.last_error})")
+    
+    def _read_counters(self):
+        net = psutil.net_io_counters()
+        return (time.time(), net.bytes_recv, net.bytes_sent, net.packets_recv, net.packets_sent,
+                psutil.cpu_stats().ctx_switches)
     
     def _monitor_loop(self):
+        # Erster Aufruf initialisiert die CPU-Deltas und liefert keinen Messwert
+        psutil.cpu_percent(interval=None, percpu=True)
+        previous = self._read_counters()
+        next_sample = time.time() + self.interval
+        
         while self.monitoring:
+            time.sleep(max(0, next_sample - time.time()))
+            next_sample += self.interval
             try:
-                cpu = psutil.cpu_percent(interval=1)
-                memory = psutil.virtual_memory().percent
-                self.cpu_samples.append(cpu)
-                self.memory_samples.append(memory)
-            except:
-                pass
+                per_core = psutil.cpu_percent(interval=None, percpu=True)
+                current = self._read_counters()
+                elapsed = current[0] - previous[0]
+                if elapsed <= 0:
+                    continue
+                rates = [(now - before) / elapsed for now, before in zip(current[1:], previous[1:])]
+                previous = current
+                self.samples.append(SystemSample(
+                    timestamp=current[0],
+                    cpu=sum(per_core) / len(per_core) if per_core else 0,
+                    cpu_per_core=tuple(per_core),
+                    memory=psutil.virtual_memory().percent,
+                    swap=psutil.swap_memory().percent,
+                    net_rx_mb_s=rates[0] / 1e6,
+                    net_tx_mb_s=rates[1] / 1e6,
+                    net_rx_pkts_s=rates[2],
+                    net_tx_pkts_s=rates[3],
+                    ctx_switches_s=rates[4]
+                ))
+            except Exception as e:
+                self.error_count += 1
+                self.last_error = repr(e)
+    
+    def _metric_values(self, metric):
+        samples = list(self.samples)
+        if metric == "cpu_core_max":
+            return [max(sample.cpu_per_core) for sample in samples if sample.cpu_per_core]
+        return [getattr(sample, metric) for sample in samples]
     
     def get_average_cpu(self):
-        return sum(self.cpu_samples) / len(self.cpu_samples) if self.cpu_samples else 0
+        values = self._metric_values("cpu")
+        return sum(values) / len(values) if values else 0
     
     def get_average_memory(self):
-        return sum(self.memory_samples) / len(self.memory_samples) if self.memory_samples else 0
+        values = self._metric_values("memory")
+        return sum(values) / len(values) if values else 0
+    
+    def get_summary(self):
+        """Min/P95/Max aller Kennzahlen über die gepufferten Samples"""
+        summary = {}
+        for metric in SYSTEM_METRICS:
+            values = self._metric_values(metric)
+            if values:
+                summary[metric] = (min(values), percentile(values, 95), max(values))
+        return summary
+    
+    def export_samples(self, filename, user_count, model, workload):
+        """Hängt die Samples eines Schritts an eine CSV-Datei an"""
+        try:
+            write_header = not os.path.exists(filename)
+            with open(filename, 'a', encoding='utf-8') as f:
+                if write_header:
+                    f.write("Zeitstempel,Benutzer,Modell,Workload,CPU,CPU_pro_Kern,Memory,Swap,Net_RX_MB_s,Net_TX_MB_s,Net_RX_Pakete_s,Net_TX_Pakete_s,Kontextwechsel_s\n")
+                for sample in list(self.samples):
+                    cores = ";".join(f"{core:.1f}" for core in sample.cpu_per_core)
+                    f.write(f"{sample.timestamp:.3f},{user_count},{model},{workload},{sample.cpu:.1f},{cores},{sample.memory:.1f},{sample.swap:.1f},{sample.net_rx_mb_s:.3f},{sample.net_tx_mb_s:.3f},{sample.net_rx_pkts_s:.1f},{sample.net_tx_pkts_s:.1f},{sample.ctx_switches_s:.1f}\n")
+        except Exception as e:
+            print(f"Fehler beim Speichern der System-Samples: {e}")
 
 # Globale Variablen für Ergebnissammlung
-response_times = multiprocessing.Manager().list()
-ttft_times = multiprocessing.Manager().list()  # Time to First Token
-error_count = multiprocessing.Manager().Value('i', 0)
-success_count = multiprocessing.Manager().Value('i', 0)
+# Werden erst beim ersten Test angelegt (init_shared_state), damit der Import keinen Manager-Prozess startet
+_manager = None
+response_times = None
+ttft_times = None  # Time to First Token
+token_counts = None  # Generierte Tokens (eval_count)
+# Pro Request: (Start, Ende, load, prompt_eval, eval, total) - Zeiten in Sekunden
+request_timings = None
+# Pro Request: (Start, Ende, TTFT oder -1, Fehlerklasse oder "", Tokens, Persona, User-ID, Prompt-Index oder -1)
+request_events = None
+# Pro Request im Shared-Prefix-Workload: (Kohorte, TTFT, prompt_eval in s, prompt_eval_count)
+prefix_events = None
+# Pro abgebrochenem Request: (Start, Abbruchzeit, TTFT oder -1, empfangene Chunks, User-ID)
+abandon_events = None
+error_count = None
+success_count = None
+
+def init_shared_state():
+    """Legt die prozessübergreifenden Listen und Zähler an (einmalig, ein Manager-Prozess)
+    
+    Benutzer-Prozesse erhalten die Proxies als Argument (get_shared_state),
+    damit es auch mit den Startmethoden spawn und forkserver funktioniert.
+    """
+    global _manager, response_times, ttft_times, token_counts, request_timings, request_events, prefix_events, abandon_events, error_count, success_count
+    if _manager is not None:
+        return
+    _manager = multiprocessing.Manager()
+    response_times = _manager.list()
+    ttft_times = _manager.list()
+    token_counts = _manager.list()
+    request_timings = _manager.list()
+    request_events = _manager.list()
+    prefix_events = _manager.list()
+    abandon_events = _manager.list()
+    error_count = _manager.Value('i', 0)
+    success_count = _manager.Value('i', 0)
+
+def get_shared_state():
+    """Proxies der gemeinsamen Listen und Zähler zur Übergabe an Benutzer-Prozesse"""
+    init_shared_state()
+    return (response_times, ttft_times, token_counts, request_timings, request_events, prefix_events,
+            abandon_events, error_count, success_count)
+
+def attach_shared_state(state):
+    """Übernimmt die Proxies aus get_shared_state im Benutzer-Prozess"""
+    global response_times, ttft_times, token_counts, request_timings, request_events, prefix_events, abandon_events, error_count, success_count
+    (response_times, ttft_times, token_counts, request_timings, request_events, prefix_events,
+     abandon_events, error_count, success_count) = state
+
+# Parameter, die per Sweep variiert werden können
+SWEEP_PARAMS = ("num_ctx", "num_predict", "num_batch", "temperature", "seed", "keep_alive")
+# Parameter, deren Änderung ein Neuladen des Modells erzwingt
+RELOAD_PARAMS = ("num_ctx", "num_batch")
+# Parameter auf oberster Ebene des Requests (nicht in "options")
+TOP_LEVEL_PARAMS = ("keep_alive",)
+
+def parse_keep_alive(value):
+    """Zahlen (Sekunden, -1 = unbegrenzt) als int, Dauern mit Einheit wie '30m' als String
+    
+    Ollama parst String-Werte als Go-Duration, ein nacktes "300" wäre ungültig.
+    """
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+PARAM_TYPES = {
+    "num_ctx": int,
+    "num_predict": int,
+    "num_batch": int,
+    "temperature": float,
+    "seed": int,
+    "keep_alive": parse_keep_alive,
+}
 
 def reset_counters():
     """Setzt die globalen Zähler zurück"""
-    global response_times, ttft_times, error_count, success_count
+    init_shared_state()
     response_times[:] = []
     ttft_times[:] = []
+    token_counts[:] = []
+    request_timings[:] = []
+    request_events[:] = []
+    prefix_events[:] = []
+    abandon_events[:] = []
     error_count.value = 0
     success_count.value = 0
 
@@ -107,58 +468,650 @@ def load_prompts(file_path):
     with open(file_path, "r", encoding="utf-8") as f:
         return [line.strip() for line in f if line.strip()]
 
-def ollama_chat_continuous(model, prompts, user_id, pause_min, pause_max, base_url, test_duration):
-    """Simuliert einen Benutzer für eine bestimmte Testdauer"""
-    global response_times, ttft_times, error_count, success_count
+def parse_sweep_matrix(spec):
+    """Parst eine Sweep-Matrix wie 'num_ctx=2048,4096;num_predict=128,512'"""
+    matrix = {}
+    for part in spec.split(';'):
+        part = part.strip()
+        if not part:
+            continue
+        if '=' not in part:
+            raise ValueError(f"Ungültiger Sweep-Eintrag '{part}' (erwartet: name=wert1,wert2)")
+        name, values = part.split('=', 1)
+        name = name.strip()
+        if name not in SWEEP_PARAMS:
+            raise ValueError(f"Unbekannter Sweep-Parameter '{name}' (erlaubt: {', '.join(SWEEP_PARAMS)})")
+        converter = PARAM_TYPES[name]
+        parsed = [converter(v.strip()) for v in values.split(',') if v.strip()]
+        if not parsed:
+            raise ValueError(f"Keine Werte für Sweep-Parameter '{name}' angegeben")
+        matrix[name] = parsed
+    return matrix
+
+def build_sweep_plan(matrix):
+    """Erzeugt alle Parameter-Kombinationen, gruppiert nach Modell-Neuladen"""
+    if not matrix:
+        return [{}]
+    # Reload-relevante Parameter zuerst, damit Kombinationen mit gleichem
+    # geladenen Modell direkt hintereinander laufen
+    names = [n for n in RELOAD_PARAMS if n in matrix] + [n for n in SWEEP_PARAMS if n in matrix and n not in RELOAD_PARAMS]
+    return [dict(zip(names, values)) for values in itertools.product(*(matrix[n] for n in names))]
+
+def format_params(params):
+    """Formatiert eine Parameter-Kombination für Ausgaben"""
+    return " ".join(f"{k}={v}" for k, v in params.items()) if params else "Standard"
+
+def split_params(params):
+    """Trennt Parameter in Ollama-"options" und Felder auf oberster Ebene"""
+    params = params or {}
+    options = {k: v for k, v in params.items() if k not in TOP_LEVEL_PARAMS}
+    top_level = {k: v for k, v in params.items() if k in TOP_LEVEL_PARAMS}
+    return options, top_level
+
+@dataclass
+class StreamChunk:
+    """Normalisiertes Stück einer Antwort, unabhängig vom Endpunkt"""
+    text: str = ""
+    done: bool = False
+    stats: dict = field(default_factory=dict)
+
+class Workload:
+    """Basisklasse für Workload-Adapter (Request-Aufbau und Stream-Parser)"""
+    name = ""
+    path = ""
+    streaming = True
+    # Sweep-Parameter, die der Endpunkt tatsächlich übermittelt
+    supported_params = SWEEP_PARAMS
+    
+    def build_payload(self, model, prompt, params=None):
+        raise NotImplementedError
+    
+    def iter_chunks(self, response):
+        raise NotImplementedError
+
+class NdjsonWorkload(Workload):
+    """Gemeinsamer Parser für Ollamas natives NDJSON-Streaming"""
+    
+    def extract_text(self, data):
+        raise NotImplementedError
+    
+    def iter_chunks(self, response):
+        for line in response.iter_lines():
+            if not line:
+                continue
+            try:
+                data = json.loads(line.decode('utf-8'))
+            except json.JSONDecodeError:
+                continue
+            done = data.get('done', False)
+            yield StreamChunk(self.extract_text(data), done, data if done else {})
+            if done:
+                break
+
+class GenerateWorkload(NdjsonWorkload):
+    """POST /api/generate"""
+    name = "generate"
+    path = "/api/generate"
+    
+    def build_payload(self, model, prompt, params=None):
+        options, top_level = split_params(params)
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True  # Streaming aktivieren für TTFT-Messung
+        }
+        if options:
+            payload["options"] = options
+        payload.update(top_level)
+        return payload
+    
+    def extract_text(self, data):
+        return data.get('response', '')
+
+class ChatWorkload(NdjsonWorkload):
+    """POST /api/chat"""
+    name = "chat"
+    path = "/api/chat"
+    
+    def build_payload(self, model, prompt, params=None):
+        options, top_level = split_params(params)
+        payload = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": True
+        }
+        if options:
+            payload["options"] = options
+        payload.update(top_level)
+        return payload
+    
+    def extract_text(self, data):
+        return (data.get('message') or {}).get('content', '')
+
+class OpenAIChatWorkload(Workload):
+    """POST /v1/chat/completions (OpenAI-kompatibel, Server-Sent Events)"""
+    name = "openai"
+    path = "/v1/chat/completions"
+    # Ollama-Optionen, die die OpenAI-Schnittstelle unterstützt
+    OPTION_MAP = {"num_predict": "max_tokens", "temperature": "temperature", "seed": "seed"}
+    supported_params = tuple(OPTION_MAP)
+    
+    def build_payload(self, model, prompt, params=None):
+        payload = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": True,
+            "stream_options": {"include_usage": True}
+        }
+        for name, value in (params or {}).items():
+            if name in self.OPTION_MAP:
+                payload[self.OPTION_MAP[name]] = value
+        return payload
+    
+    def iter_chunks(self, response):
+        stats = {}
+        for line in response.iter_lines():
+            if not line or not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                # Nur ein explizites [DONE] gilt als vollständige Antwort
+                yield StreamChunk(done=True, stats=stats)
+                return
+            try:
+                event = json.loads(data.decode('utf-8'))
+            except json.JSONDecodeError:
+                continue
+            usage = event.get('usage')
+            if usage:
+                stats = {
+                    "prompt_eval_count": usage.get('prompt_tokens', 0),
+                    "eval_count": usage.get('completion_tokens', 0)
+                }
+            text = "".join((choice.get('delta') or {}).get('content') or '' for choice in event.get('choices') or [])
+            yield StreamChunk(text)
+
+class EmbedWorkload(Workload):
+    """POST /api/embed (keine Token-Ausgabe, TTFT = Gesamtzeit)"""
+    name = "embed"
+    path = "/api/embed"
+    streaming = False
+    
+    def build_payload(self, model, prompt, params=None):
+        options, top_level = split_params(params)
+        payload = {"model": model, "input": prompt}
+        if options:
+            payload["options"] = options
+        payload.update(top_level)
+        return payload
+    
+    def iter_chunks(self, response):
+        data = response.json()
+        # Bei Embeddings zählen die verarbeiteten Eingabe-Tokens als Durchsatz
+        stats = dict(data)
+        stats.pop('embeddings', None)
+        stats['eval_count'] = data.get('prompt_eval_count', 0)
+        yield StreamChunk(done=True, stats=stats)
+
+WORKLOADS = {workload.name: workload for workload in (
+    GenerateWorkload(), ChatWorkload(), OpenAIChatWorkload(), EmbedWorkload()
+)}
+
+def check_workload_params(workload_name, param_names):
+    """Wirft ValueError, wenn der Workload einen Parameter nicht senden kann (sonst misst er Server-Defaults)"""
+    unsupported = [name for name in param_names if name not in WORKLOADS[workload_name].supported_params]
+    if unsupported:
+        raise ValueError(f"Workload '{workload_name}' unterstützt die Parameter {', '.join(unsupported)} nicht "
+                         f"(erlaubt: {', '.join(WORKLOADS[workload_name].supported_params)})")
+
+# Unterstützte Verteilungen für Denkpausen von Personas
+THINK_TIME_DISTRIBUTIONS = ("uniform", "exponential", "lognormal", "empirical")
+
+@dataclass
+class Persona:
+    """Benutzertyp mit eigenem Prompt-Bestand, Denkpausen-Verteilung und Gewicht"""
+    name: str
+    weight: float
+    prompts: List[str]
+    think_time: dict
+
+def fit_empirical_think_time(samples, bins=20):
+    """Passt ein empirisches Histogramm [[von, bis, Gewicht], ...] an gemessene Denkpausen an"""
+    samples = sorted(value for value in samples if value >= 0)
+    if not samples:
+        raise ValueError("Keine gültigen Denkpausen zum Anpassen vorhanden")
+    low, high = samples[0], samples[-1]
+    width = (high - low) / bins or 1
+    counts = [0] * bins
+    for value in samples:
+        counts[min(int((value - low) / width), bins - 1)] += 1
+    return [[low + i * width, low + (i + 1) * width, count] for i, count in enumerate(counts) if count]
+
+def sample_think_time(rng, spec, pause_min, pause_max):
+    """Zieht eine Denkpause gemäß Verteilungs-Spezifikation (ohne Spezifikation: gleichverteilt)"""
+    if not spec or spec.get("distribution", "uniform") == "uniform":
+        spec = spec or {}
+        return rng.uniform(spec.get("min", pause_min), spec.get("max", pause_max))
+    distribution = spec["distribution"]
+    if distribution == "exponential":
+        return rng.expovariate(1.0 / spec["mean"])
+    if distribution == "lognormal":
+        return rng.lognormvariate(spec["mu"], spec["sigma"])
+    if distribution == "empirical":
+        low, high, _ = rng.choices(spec["bins"], weights=[weight for _, _, weight in spec["bins"]])[0]
+        return rng.uniform(low, high)
+    raise ValueError(f"Unbekannte Verteilung '{distribution}'")
+
+def mean_think_time(spec, pause_min, pause_max):
+    """Erwartungswert einer Denkpausen-Verteilung"""
+    if not spec or spec.get("distribution", "uniform") == "uniform":
+        spec = spec or {}
+        return (spec.get("min", pause_min) + spec.get("max", pause_max)) / 2
+    distribution = spec["distribution"]
+    if distribution == "exponential":
+        return spec["mean"]
+    if distribution == "lognormal":
+        return math.exp(spec["mu"] + spec["sigma"] ** 2 / 2)
+    total_weight = sum(weight for _, _, weight in spec["bins"])
+    return sum((low + high) / 2 * weight for low, high, weight in spec["bins"]) / total_weight
+
+def validate_think_time(name, spec):
+    """Prüft die Parameter einer Denkpausen-Verteilung, wirft ValueError bei fehlenden oder ungültigen Werten"""
+    distribution = spec.get("distribution", "uniform")
+    
+    def number(key, minimum=None, positive=False):
+        if key not in spec:
+            raise ValueError(f"Persona '{name}': Verteilung '{distribution}' benötigt '{key}'")
+        try:
+            value = float(spec[key])
+        except (TypeError, ValueError):
+            raise ValueError(f"Persona '{name}': '{key}' muss eine Zahl sein")
+        if positive and value <= 0:
+            raise ValueError(f"Persona '{name}': '{key}' muss größer als 0 sein")
+        if minimum is not None and value < minimum:
+            raise ValueError(f"Persona '{name}': '{key}' darf nicht kleiner als {minimum} sein")
+        spec[key] = value
+        return value
+    
+    if distribution == "uniform":
+        # min/max sind optional (Standard: --pause-min/--pause-max)
+        low = number("min", minimum=0) if "min" in spec else None
+        high = number("max", minimum=0) if "max" in spec else None
+        if low is not None and high is not None and low > high:
+            raise ValueError(f"Persona '{name}': min darf nicht größer als max sein")
+    elif distribution == "exponential":
+        number("mean", positive=True)
+    elif distribution == "lognormal":
+        number("mu")
+        number("sigma", positive=True)
+    elif distribution == "empirical":
+        try:
+            bins = [[float(low), float(high), float(weight)] for low, high, weight in spec.get("bins") or []]
+        except (TypeError, ValueError):
+            bins = []
+        spec["bins"] = bins
+        if not bins or any(low < 0 or low > high or weight < 0 for low, high, weight in bins) \
+                or sum(weight for _, _, weight in bins) <= 0:
+            raise ValueError(f"Persona '{name}': 'bins' muss eine Liste [von, bis, Gewicht] mit 0 <= von <= bis und Gesamtgewicht > 0 sein")
+
+def load_personas(file_path, default_prompts):
+    """Liest Persona-Definitionen aus einer JSON-Datei
+    
+    Jede Persona hat "name", "weight", optional "prompts" (Pfad zu einer
+    Prompt-Datei) oder "prompt_indices" (Teilmenge des Haupt-Corpus) und
+    "think_time" (Verteilung; bei "empirical" wahlweise "bins" oder
+    "samples_file" mit gemessenen Pausen, eine pro Zeile).
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        definitions = json.load(f)
+    
+    personas = []
+    for definition in definitions:
+        name = definition["name"]
+        if "prompts" in definition:
+            prompts = load_prompts(definition["prompts"])
+        elif "prompt_indices" in definition:
+            prompts = [default_prompts[i] for i in definition["prompt_indices"]]
+        else:
+            prompts = list(default_prompts)
+        if not prompts:
+            raise ValueError(f"Persona '{name}' hat keine Prompts")
+        
+        think_time = dict(definition.get("think_time", {}))
+        distribution = think_time.get("distribution", "uniform")
+        if distribution not in THINK_TIME_DISTRIBUTIONS:
+            raise ValueError(f"Persona '{name}': unbekannte Verteilung '{distribution}' (erlaubt: {', '.join(THINK_TIME_DISTRIBUTIONS)})")
+        if distribution == "empirical" and "bins" not in think_time:
+            if "samples_file" not in think_time:
+                raise ValueError(f"Persona '{name}': Verteilung 'empirical' benötigt 'bins' oder 'samples_file'")
+            with open(think_time["samples_file"], "r", encoding="utf-8") as f:
+                think_time["bins"] = fit_empirical_think_time(float(line) for line in f if line.strip())
+        validate_think_time(name, think_time)
+        
+        weight = float(definition.get("weight", 1.0))
+        if weight <= 0:
+            raise ValueError(f"Persona '{name}': weight muss größer als 0 sein")
+        personas.append(Persona(name, weight, prompts, think_time))
+    
+    if not personas:
+        raise ValueError("Keine Personas definiert")
+    return personas
+
+def assign_personas(personas, user_count, seed=None):
+    """Verteilt die Benutzer eines Schritts gemäß Gewichten auf die Personas
+    
+    Die Anzahl pro Persona folgt dem Verfahren der größten Reste, die
+    Zuordnung zu User-IDs wird reproduzierbar gemischt.
+    """
+    total_weight = sum(persona.weight for persona in personas)
+    quotas = [persona.weight / total_weight * user_count for persona in personas]
+    counts = [int(quota) for quota in quotas]
+    by_remainder = sorted(range(len(personas)), key=lambda i: quotas[i] - counts[i], reverse=True)
+    for i in by_remainder[:user_count - sum(counts)]:
+        counts[i] += 1
+    
+    assignment = [persona for persona, count in zip(personas, counts) for _ in range(count)]
+    random.Random(f"personas:{seed}:{user_count}").shuffle(assignment)
+    return assignment
+
+@dataclass
+class PrefixConfig:
+    """Konfiguration des Shared-Prefix-Workloads (Prompt-Cache-Messung)"""
+    count: int
+    tokens: int
+    reuse: float
+    prefixes: List[str] = field(default_factory=list)
+
+def generate_prefix_text(rng, vocabulary, tokens):
+    """Erzeugt synthetischen Vorspann mit ungefähr der gewünschten Token-Anzahl (~0,75 Wörter pro Token)"""
+    word_count = max(1, int(tokens * 0.75))
+    return " ".join(rng.choice(vocabulary) for _ in range(word_count))
+
+def build_prefix_config(count, tokens, reuse, prompts, seed=None):
+    """Erzeugt die geteilten Präfixe (System-Prompt/RAG-Vorspann) aus dem Wortschatz des Corpus"""
+    vocabulary = sorted({word for prompt in prompts for word in prompt.split()})
+    rng = random.Random(f"prefixes:{seed}")
+    prefixes = [f"[Kontext {i + 1}] " + generate_prefix_text(rng, vocabulary, tokens) for i in range(count)]
+    return PrefixConfig(count, tokens, reuse, prefixes)
+
+def derive_user_seed(seed, user_count, user_id):
+    """Leitet einen stabilen, unabhängigen Seed pro simuliertem Benutzer ab"""
+    digest = hashlib.sha256(f"{seed}:{user_count}:{user_id}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+def user_schedule(seed, user_count, user_id, prompt_count, pause_min, pause_max, batch_size=1, think_time=None):
+    """Erzeugt die Folge (Prompt-Indizes, Denkpause) eines simulierten Benutzers
+    
+    Mit Seed ist die Folge reproduzierbar, ohne Seed erhält jeder Benutzer
+    einen eigenen, zufällig initialisierten Zufallsgenerator.
+    """
+    rng = random.Random(derive_user_seed(seed, user_count, user_id)) if seed is not None else random.Random()
+    while True:
+        prompt_indices = [rng.randrange(prompt_count) for _ in range(batch_size)]
+        pause_time = sample_think_time(rng, think_time, pause_min, pause_max)
+        yield prompt_indices, pause_time
+
+def limit_schedule(schedule, test_duration):
+    """Begrenzt einen Schedule auf die Requests, die ein Benutzer in test_duration höchstens starten kann
     
+    Auf jeden Request folgt seine Denkpause; sobald die Summe der Pausen die
+    Testdauer erreicht, startet kein weiterer Request. So passt die Länge
+    auch zu Persona-Verteilungen, die nicht von pause_min abhängen.
+    """
+    max_requests = int(test_duration / 0.01) + 1  # Sicherheitsgrenze bei Denkpausen nahe 0
+    elapsed = 0.0
+    for nr, entry in enumerate(schedule):
+        if elapsed >= test_duration or nr >= max_requests:
+            return
+        yield entry
+        elapsed += entry[1]
+
+def export_schedule(filename, prompts, user_steps, seed, pause_min, pause_max, test_duration, batch_sizes=(1,),
+                    personas=None):
+    """Exportiert den vollständigen Request-Schedule aller Schritte als CSV"""
+    corpus_hash = hashlib.sha256("\n".join(prompts).encode("utf-8")).hexdigest()
+    try:
+        with open(filename, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(f"# seed={seed} prompts_sha256={corpus_hash} pause_min={pause_min} pause_max={pause_max}\n")
+            f.write("Batch,Benutzer,User_ID,Persona,Nr,Prompt_Index,Pause\n")
+            for batch_size in batch_sizes:
+                for user_count in user_steps:
+                    assignment = assign_personas(personas, user_count, seed) if personas else [None] * user_count
+                    for user_id, persona in enumerate(assignment):
+                        prompt_count = len(persona.prompts) if persona else len(prompts)
+                        schedule = user_schedule(seed, user_count, user_id, prompt_count, pause_min, pause_max, batch_size,
+                                                 persona.think_time if persona else None)
+                        persona_name = persona.name if persona else ""
+                        for nr, (prompt_indices, pause_time) in enumerate(limit_schedule(schedule, test_duration)):
+                            indices = ";".join(str(i) for i in prompt_indices)
+                            f.write(f"{batch_size},{user_count},{user_id},{persona_name},{nr},{indices},{pause_time!r}\n")
+        print(f"Request-Schedule gespeichert in: {filename}")
+    except Exception as e:
+        print(f"Fehler beim Speichern des Schedules: {e}")
+
+@dataclass
+class Timeouts:
+    """Zeitlimits pro Request-Phase in Sekunden (0 = kein Limit)"""
+    connect: float = 10.0
+    ttft: float = 120.0
+    stall: float = 30.0
+    total: float = 0.0
+    
+    def read_timeout(self, elapsed, first_token):
+        """Socket-Timeout für den nächsten Lesevorgang in der aktuellen Phase"""
+        limit = self.stall if first_token else self.ttft
+        if self.total:
+            remaining = max(self.total - elapsed, 0.001)
+            limit = min(limit, remaining) if limit else remaining
+        return limit or None
+
+@dataclass
+class AbandonConfig:
+    """Client-Abbrüche: Anteil der Requests und Abbruchpunkt (nach Tokens und/oder Sekunden, was zuerst eintritt)"""
+    probability: float
+    after_tokens: int = 0
+    after_seconds: float = 0.0
+
+class RequestAbandoned(Exception):
+    """Simulierter Client-Abbruch (kein Fehler)"""
+
+def format_abandon_cutoff(abandon_config):
+    """Beschreibt den Abbruchpunkt für Ausgaben"""
+    parts = []
+    if abandon_config.after_tokens:
+        parts.append(f"nach {abandon_config.after_tokens} Tokens")
+    if abandon_config.after_seconds:
+        parts.append(f"nach {abandon_config.after_seconds:g}s")
+    return " oder ".join(parts)
+
+def abandon_read_timeout(limit, abandon_deadline):
+    """Verkürzt ein Lese-Timeout auf die Restzeit bis zum geplanten Abbruch"""
+    if abandon_deadline is None:
+        return limit
+    remaining = max(abandon_deadline - time.time(), 0.001)
+    return min(limit, remaining) if limit else remaining
+
+class RequestPhaseError(Exception):
+    """Abbruch eines Requests durch ein Phasen-Limit oder einen unvollständigen Stream"""
+    def __init__(self, error_class):
+        super().__init__(error_class)
+        self.error_class = error_class
+
+def set_read_timeout(response, seconds):
+    """Passt das Lese-Timeout eines laufenden Streams an (best effort)"""
+    connection = getattr(response.raw, 'connection', None)
+    sock = getattr(connection, 'sock', None)
+    if sock is not None:
+        sock.settimeout(seconds)
+
+def classify_exception(error, timeouts, elapsed, first_token):
+    """Ordnet eine Exception einer Fehlerklasse zu
+    
+    Klassen: connect_refused, connect_timeout, reset, ttft_timeout, stall,
+    deadline, truncated, connection, other (HTTP-Fehler als http_<code>).
+    """
+    if isinstance(error, RequestPhaseError):
+        return error.error_class
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return "connect_timeout"
+    
+    # Ursachenkette durchlaufen (requests verpackt urllib3- und Socket-Fehler)
+    chain = []
+    pending = [error]
+    while pending and len(chain) < 20:
+        current = pending.pop()
+        if not isinstance(current, BaseException) or current in chain:
+            continue
+        chain.append(current)
+        pending.extend(current.args)
+        pending.extend((getattr(current, 'reason', None), current.__cause__, current.__context__))
+    
+    if any(isinstance(e, ConnectionRefusedError) for e in chain):
+        return "connect_refused"
+    if isinstance(error, requests.exceptions.Timeout) or any(
+            isinstance(e, (TimeoutError, urllib3.exceptions.TimeoutError)) for e in chain):
+        if timeouts.total and elapsed >= timeouts.total:
+            return "deadline"
+        return "stall" if first_token else "ttft_timeout"
+    if any(isinstance(e, (ConnectionResetError, BrokenPipeError, urllib3.exceptions.ProtocolError)) for e in chain) \
+            or isinstance(error, requests.exceptions.ChunkedEncodingError):
+        return "reset"
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return "connection"
+    if isinstance(error, ValueError):
+        # Nicht lesbarer Antwort-Body (z.B. abgeschnittenes JSON bei Embeddings)
+        return "truncated"
+    return "other"
+
+def ollama_chat_continuous(model, prompts, user_id, pause_min, pause_max, base_url, test_duration, params=None,
+                           seed=None, user_count=0, workload_name="generate", batch_size=1, persona=None,
+                           prefix_config=None, active_flags=None, timeouts=None, abandon_config=None,
+                           shared_state=None):
+    """Simuliert einen Benutzer für eine bestimmte Testdauer
+    
+    Ausgaben pro Request erfolgen nicht hier, sondern gesammelt über
+    request_events im Elternprozess (LiveConsole).
+    """
+    if shared_state is not None:
+        attach_shared_state(shared_state)
+    
+    workload = WORKLOADS[workload_name]
+    timeouts = timeouts or Timeouts()
+    persona_name = persona.name if persona else ""
+    if persona:
+        prompts = persona.prompts
     end_time = time.time() + test_duration
+    schedule = user_schedule(seed, user_count, user_id, len(prompts), pause_min, pause_max, batch_size,
+                             persona.think_time if persona else None)
+    if prefix_config:
+        # Eigener Zufallsstrom für Präfixe, damit der Prompt-Schedule unverändert bleibt
+        prefix_rng = random.Random(derive_user_seed(seed, user_count, f"{user_id}:prefix")) if seed is not None else random.Random()
+        vocabulary = sorted({word for text in prompts for word in text.split()})
+    if abandon_config:
+        abandon_rng = random.Random(derive_user_seed(seed, user_count, f"{user_id}:abandon")) if seed is not None else random.Random()
     
     while time.time() < end_time:
-        # Zufälligen Prompt auswählen
-        prompt = random.choice(prompts)
+        # Nächsten Prompt und Denkpause aus dem Schedule des Benutzers holen
+        prompt_indices, pause_time = next(schedule)
+        if batch_size > 1:
+            # Embedding-Batch: Liste von Dokumenten als "input" (keinem einzelnen Prompt zuordenbar)
+            prompt = [prompts[i] for i in prompt_indices]
+            prompt_index = -1
+        else:
+            prompt_index = prompt_indices[0]
+            prompt = prompts[prompt_index]
+        
+        # Geteilten oder einmaligen Präfix voranstellen
+        request_prompt = prompt
+        cohort = ""
+        if prefix_config:
+            if prefix_rng.random() < prefix_config.reuse:
+                cohort = "shared"
+                prefix = prefix_config.prefixes[prefix_rng.randrange(prefix_config.count)]
+            else:
+                cohort = "unique"
+                prefix = generate_prefix_text(prefix_rng, vocabulary, prefix_config.tokens)
+            request_prompt = f"{prefix}\n\n{prompt}"
         
+        if active_flags is not None:
+            active_flags[user_id] = 1
+        start_time = time.time()
+        ttft_measured = False
+        response = None
+        # Dieser Request wird vom Benutzer vorzeitig abgebrochen (Tab geschlossen)
+        abandon = abandon_config is not None and abandon_rng.random() < abandon_config.probability
+        abandon_deadline = start_time + abandon_config.after_seconds if abandon and abandon_config.after_seconds else None
+        received_chunks = 0
         try:
-            start_time = time.time()
-            ttft_measured = False
-            
             # HTTP-Request an Ollama API mit Streaming für TTFT
+            # Lese-Timeout bis zum Header/ersten Token = TTFT-Limit (bzw. Restzeit der Deadline)
             response = requests.post(
-                f"{base_url}/api/generate",
-                json={
-                    "model": model,
-                    "prompt": prompt,
-                    "stream": True  # Streaming aktivieren für TTFT-Messung
-                },
-                timeout=120,
-                stream=True
+                f"{base_url}{workload.path}",
+                json=workload.build_payload(model, request_prompt, params),
+                timeout=(timeouts.connect or None, abandon_read_timeout(timeouts.read_timeout(0, False), abandon_deadline)),
+                stream=workload.streaming
             )
             
             if response.status_code == 200:
                 full_response = ""
                 first_token_time = None
+                output_tokens = 0
+                final_stats = {}
+                done = False
+                last_chunk_time = time.time()
                 
-                # Stream-Response verarbeiten
-                for line in response.iter_lines():
-                    if line:
-                        try:
-                            data = json.loads(line.decode('utf-8'))
-                            
-                            # Erstes Token = TTFT
-                            if not ttft_measured and 'response' in data and data['response']:
-                                first_token_time = time.time() - start_time
-                                ttft_times.append(first_token_time)
-                                ttft_measured = True
-                            
-                            # Response sammeln
-                            if 'response' in data:
-                                full_response += data['response']
-                                
-                            # Ende der Response
-                            if data.get('done', False):
-                                break
-                                
-                        except json.JSONDecodeError:
-                            continue
+                # Stream-Response über den Workload-Adapter verarbeiten
+                for chunk in workload.iter_chunks(response):
+                    now = time.time()
+                    # Langsam tröpfelnde Streams erkennen, die das Socket-Timeout nie auslösen
+                    if timeouts.total and now - start_time > timeouts.total:
+                        raise RequestPhaseError("deadline")
+                    if ttft_measured and timeouts.stall and now - last_chunk_time > timeouts.stall:
+                        raise RequestPhaseError("stall")
+                    if not ttft_measured and timeouts.ttft and now - start_time > timeouts.ttft:
+                        raise RequestPhaseError("ttft_timeout")
+                    last_chunk_time = now
+                    
+                    # Erstes Token = TTFT
+                    if not ttft_measured and chunk.text:
+                        first_token_time = now - start_time
+                        ttft_measured = True
+                        # Ab jetzt gilt das Limit zwischen zwei Chunks
+                        set_read_timeout(response, abandon_read_timeout(timeouts.read_timeout(first_token_time, True), abandon_deadline))
+                    elif ttft_measured and (timeouts.total or abandon_deadline):
+                        set_read_timeout(response, abandon_read_timeout(timeouts.read_timeout(now - start_time, True), abandon_deadline))
+                    
+                    # Response sammeln
+                    full_response += chunk.text
+                    if chunk.text:
+                        received_chunks += 1
+                    
+                    # Vorzeitiger Abbruch durch den Benutzer (ein Chunk entspricht etwa einem Token)
+                    if abandon and not chunk.done and (
+                            (abandon_config.after_tokens and received_chunks >= abandon_config.after_tokens)
+                            or (abandon_deadline and now >= abandon_deadline)):
+                        raise RequestAbandoned()
+                    
+                    # Ende der Response
+                    if chunk.done:
+                        done = True
+                        output_tokens = chunk.stats.get('eval_count', 0)
+                        final_stats = chunk.stats
+                        token_counts.append(output_tokens)
+                        # Server-Zeiten (Nanosekunden) für die Latenz-Zerlegung
+                        if 'total_duration' in chunk.stats:
+                            request_timings.append((
+                                start_time, time.time(),
+                                chunk.stats.get('load_duration', 0) / 1e9,
+                                chunk.stats.get('prompt_eval_duration', 0) / 1e9,
+                                chunk.stats.get('eval_duration', 0) / 1e9,
+                                chunk.stats['total_duration'] / 1e9
+                            ))
+                        break
+                
+                # Stream ohne Abschluss-Chunk (Verbindung sauber geschlossen, Antwort unvollständig)
+                if not done:
+                    raise RequestPhaseError("truncated")
                 
                 elapsed_time = time.time() - start_time
                 response_times.append(elapsed_time)
@@ -166,28 +1119,566 @@ def ollama_chat_continuous(model, prompts, user_id, pause_min, pause_max, base_u
                 
                 # Falls kein Token empfangen wurde, TTFT = Total Time
                 if not ttft_measured:
-                    ttft_times.append(elapsed_time)
+                    first_token_time = elapsed_time
+                # TTFT erst bei vollständigem Request erfassen (nicht für Abbrüche und Fehler)
+                ttft_times.append(first_token_time)
                 
-                print(f"[User {user_id}] ✓ {elapsed_time:.2f}s (TTFT: {first_token_time:.2f}s) - {prompt[:30]}...")
+                request_events.append((start_time, time.time(), first_token_time, "", output_tokens, persona_name, user_id,
+                                       prompt_index))
+                if cohort:
+                    prefix_events.append((cohort, first_token_time,
+                                          final_stats.get('prompt_eval_duration', 0) / 1e9,
+                                          final_stats.get('prompt_eval_count', 0)))
             else:
                 error_count.value += 1
-                print(f"[User {user_id}] ✗ HTTP-Fehler {response.status_code}")
+                request_events.append((start_time, time.time(), -1.0, f"http_{response.status_code}", 0, persona_name, user_id,
+                                       prompt_index))
                 
-        except requests.exceptions.Timeout:
-            error_count.value += 1
-            print(f"[User {user_id}] ✗ Timeout")
-        except requests.exceptions.ConnectionError:
-            error_count.value += 1
-            print(f"[User {user_id}] ✗ Verbindungsfehler")
         except Exception as e:
-            error_count.value += 1
-            print(f"[User {user_id}] ✗ Fehler: {e}")
+            error_class = classify_exception(e, timeouts, time.time() - start_time, ttft_measured)
+            if isinstance(e, RequestAbandoned) or (
+                    abandon_deadline and error_class in ("ttft_timeout", "stall") and time.time() >= abandon_deadline - 0.01):
+                # Kein Fehler: Verbindung wird bewusst getrennt (response.close() im finally)
+                abandon_events.append((start_time, time.time(), first_token_time if ttft_measured else -1.0,
+                                       received_chunks, user_id))
+            else:
+                error_count.value += 1
+                request_events.append((start_time, time.time(), -1.0, error_class, 0, persona_name, user_id, prompt_index))
+        finally:
+            # Verbindung schließen, damit der Server abgebrochene Generierungen beendet
+            if response is not None:
+                response.close()
+            if active_flags is not None:
+                active_flags[user_id] = 0
         
         # Pause zwischen Requests (nur wenn noch Zeit bleibt)
         if time.time() < end_time:
-            pause_time = random.uniform(pause_min, pause_max)
             time.sleep(min(pause_time, end_time - time.time()))
 
+def percentile(values, pct):
+    """Berechnet ein Perzentil (lineare Interpolation) einer Werteliste"""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+def decompose_latency(timings):
+    """Zerlegt die Latenz jedes Requests in Warteschlange/Netzwerk, Laden, Prompt-Eval und Generierung
+    
+    Warteschlange/Netzwerk ist der Rest der Wall-Clock-Zeit, die der Server
+    nicht als total_duration meldet.
+    """
+    components = {"queue": [], "load": [], "prompt_eval": [], "eval": []}
+    for start, end, load, prompt_eval, eval_time, total in timings:
+        components["queue"].append(max(0.0, (end - start) - total))
+        components["load"].append(load)
+        components["prompt_eval"].append(prompt_eval)
+        components["eval"].append(eval_time)
+    return components
+
+def estimate_parallelism(timings):
+    """Schätzt die effektive Server-Parallelität aus überlappenden Verarbeitungsintervallen
+    
+    Als aktiv gilt ein Request während Prompt-Eval und Generierung, also
+    [Ende - prompt_eval - eval, Ende]. Ergebnis ist das zeitgewichtete
+    95. Perzentil der Anzahl gleichzeitig aktiver Requests.
+    """
+    events = []
+    for start, end, load, prompt_eval, eval_time, total in timings:
+        active = prompt_eval + eval_time
+        if active > 0:
+            events.append((end - active, 1))
+            events.append((end, -1))
+    if not events:
+        return 0
+    events.sort()
+    
+    # Zeit pro Parallelitätsstufe aufsummieren (nur solange mindestens ein Request aktiv ist)
+    time_at_level = {}
+    level = 0
+    last_time = events[0][0]
+    for timestamp, delta in events:
+        if level > 0:
+            time_at_level[level] = time_at_level.get(level, 0) + (timestamp - last_time)
+        level += delta
+        last_time = timestamp
+    
+    busy_time = sum(time_at_level.values())
+    if busy_time <= 0:
+        return 0
+    cumulative = 0
+    for level in sorted(time_at_level):
+        cumulative += time_at_level[level]
+        if cumulative >= busy_time * 0.95:
+            return level
+    return max(time_at_level)
+
+def count_error_classes(events):
+    """Zählt fehlgeschlagene Requests pro Fehlerklasse"""
+    breakdown = {}
+    for event in events:
+        if event[3]:
+            breakdown[event[3]] = breakdown.get(event[3], 0) + 1
+    return breakdown
+
+# Standard-Abbruchkriterium: mehr als 30 % fehlgeschlagene Requests
+DEFAULT_ABORT_THRESHOLDS = {"total": 30.0}
+
+def parse_abort_thresholds(spec):
+    """Parst "total=30,http_5xx=10,stall=5" zu {Klasse: Prozent}
+    
+    Schlüssel sind eine Fehlerklasse, eine Gruppe wie http_4xx/http_5xx oder
+    "total" für alle Fehler zusammen.
+    """
+    thresholds = {}
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '=' not in part:
+            raise ValueError(f"Ungültiges Abbruchkriterium '{part}' (erwartet Klasse=Prozent)")
+        key, value = part.split('=', 1)
+        thresholds[key.strip()] = float(value)
+    return thresholds
+
+def error_class_matches(error_class, key):
+    """Prüft, ob eine Fehlerklasse zu einem Schwellwert-Schlüssel gehört"""
+    if key == "total":
+        return True
+    if key.endswith("xx"):
+        return error_class.startswith(key[:-2])
+    return error_class == key
+
+def error_class_rates(breakdown, total_requests):
+    """Fehlerrate pro Klasse in Prozent aller Requests"""
+    if not total_requests:
+        return {}
+    return {name: count / total_requests * 100 for name, count in sorted(breakdown.items())}
+
+def check_abort(breakdown, successful, thresholds, min_requests=10):
+    """Liefert (Schlüssel, Rate) des ersten überschrittenen Limits oder None"""
+    total_requests = successful + sum(breakdown.values())
+    if total_requests < min_requests:  # Mindestens 10 Requests für aussagekräftige Statistik
+        return None
+    for key, limit in thresholds.items():
+        failed = sum(count for name, count in breakdown.items() if error_class_matches(name, key))
+        rate = failed / total_requests * 100
+        if rate > limit:
+            return key, rate
+    return None
+
+def build_timeline(events, start_time, max_points=600):
+    """Verdichtet Request-Events zu einer Zeitreihe mit höchstens max_points Punkten
+    
+    Jeder Punkt ist (Sekunde seit Start, Requests/s, Fehler/s, Ø TTFT, Tokens/s),
+    zugeordnet nach Ende des Requests.
+    """
+    if not events:
+        return []
+    duration = max(event[1] for event in events) - start_time
+    bucket_size = max(1, math.ceil(duration / max_points))
+    buckets = {}
+    for start, end, ttft, error_class, tokens, *_ in events:
+        bucket = buckets.setdefault(int((end - start_time) // bucket_size), [0, 0, 0.0, 0])
+        if error_class:
+            bucket[1] += 1
+        else:
+            bucket[0] += 1
+            bucket[2] += ttft
+            bucket[3] += tokens
+    return [
+        (index * bucket_size, completed / bucket_size, errors / bucket_size,
+         ttft_sum / completed if completed else 0, tokens / bucket_size)
+        for index, (completed, errors, ttft_sum, tokens) in sorted(buckets.items())
+    ]
+
+def summarize_personas(events, assignment):
+    """Kennzahlen pro Persona aus den Request-Events eines Schritts"""
+    stats = {}
+    for persona in assignment:
+        entry = stats.setdefault(persona.name, {"users": 0, "requests": 0, "errors": 0, "ttft": [], "response": []})
+        entry["users"] += 1
+    for start, end, ttft, error_class, tokens, persona_name, *_ in events:
+        entry = stats.get(persona_name)
+        if entry is None:
+            continue
+        entry["requests"] += 1
+        if error_class:
+            entry["errors"] += 1
+        else:
+            entry["ttft"].append(ttft)
+            entry["response"].append(end - start)
+    
+    summary = {}
+    for name, entry in stats.items():
+        summary[name] = {
+            "users": entry["users"],
+            "requests": entry["requests"],
+            "error_rate": entry["errors"] / entry["requests"] * 100 if entry["requests"] else 0,
+            "avg_ttft": sum(entry["ttft"]) / len(entry["ttft"]) if entry["ttft"] else 0,
+            "p95_ttft": percentile(entry["ttft"], 95),
+            "avg_response_time": sum(entry["response"]) / len(entry["response"]) if entry["response"] else 0
+        }
+    return summary
+
+def summarize_prefix_cohorts(events, prefix_tokens=None):
+    """Kennzahlen für Cache-Hit- und Cache-Miss-Kohorten des Shared-Prefix-Workloads
+    
+    "unique" (einmaliger Präfix) ist immer ein Cache-Miss. Requests mit
+    geteiltem Präfix gelten als Cache-Hit, wenn Ollama weniger als die Hälfte
+    der Prompt-Tokens der Miss-Kohorte neu auswerten musste (prompt_eval_count
+    zählt nur nicht gecachte Tokens); sonst als "shared_miss". Ohne
+    Miss-Kohorte (Wiederverwendung 100 %) gilt die halbe Präfix-Länge als Schwelle.
+    """
+    if not events:
+        return {}
+    unique_counts = [count for cohort, _, _, count in events if cohort == "unique" and count > 0]
+    if unique_counts:
+        threshold = percentile(unique_counts, 50) * 0.5
+    else:
+        threshold = prefix_tokens * 0.5 if prefix_tokens else None
+    
+    cohorts = {}
+    for cohort, ttft, prompt_eval, count in events:
+        if cohort == "shared" and threshold is not None:
+            cohort = "shared_hit" if count < threshold else "shared_miss"
+        entry = cohorts.setdefault(cohort, {"ttft": [], "prompt_eval": [], "prompt_eval_count": []})
+        entry["ttft"].append(ttft)
+        entry["prompt_eval"].append(prompt_eval)
+        entry["prompt_eval_count"].append(count)
+    
+    return {
+        cohort: {
+            "requests": len(entry["ttft"]),
+            "p50_ttft": percentile(entry["ttft"], 50),
+            "p95_ttft": percentile(entry["ttft"], 95),
+            "p50_prompt_eval": percentile(entry["prompt_eval"], 50),
+            "p95_prompt_eval": percentile(entry["prompt_eval"], 95),
+            "avg_prompt_eval_count": sum(entry["prompt_eval_count"]) / len(entry["prompt_eval_count"])
+        }
+        for cohort, entry in sorted(cohorts.items())
+    }
+
+def summarize_abandonment(abandons, events, window=10.0):
+    """Wirkung abgebrochener Requests auf die TTFT der übrigen Benutzer
+    
+    Freigabe = Zeit vom Abbruch bis zum nächsten ersten Token eines anderen
+    Requests, der zu diesem Zeitpunkt bereits wartete. Gibt der Server den
+    Slot sofort frei, liegt sie nahe der Prompt-Eval-Zeit; rechnet er weiter,
+    wartet der nächste Request bis zum regulären Ende der Generierung.
+    """
+    if not abandons:
+        return {}
+    # (Zeitpunkt des ersten Tokens, Start, User-ID), sortiert nach erstem Token
+    first_tokens = sorted(
+        [(start + ttft, start, user_id) for start, end, ttft, error_class, tokens, persona_name, user_id, *_ in events if not error_class]
+        + [(start + ttft, start, user_id) for start, _, ttft, _, user_id in abandons if ttft >= 0]
+    )
+    first_token_times = [entry[0] for entry in first_tokens]
+    reclaim = []
+    for start, abandon_time, ttft, chunks, user_id in abandons:
+        for first_token, other_start, other_user in first_tokens[bisect.bisect_right(first_token_times, abandon_time):]:
+            if other_start < abandon_time and other_user != user_id:
+                reclaim.append(first_token - abandon_time)
+                break
+    
+    # TTFT von Requests, die kurz nach einem Abbruch starten, gegenüber allen übrigen
+    abandon_times = sorted(abandon_time for _, abandon_time, *_ in abandons)
+    after, other = [], []
+    for start, end, ttft, error_class, *_ in events:
+        if error_class:
+            continue
+        index = bisect.bisect_right(abandon_times, start)
+        if index and start - abandon_times[index - 1] <= window:
+            after.append(ttft)
+        else:
+            other.append(ttft)
+    
+    return {
+        "abandoned": len(abandons),
+        "avg_chunks": sum(chunks for _, _, _, chunks, _ in abandons) / len(abandons),
+        "avg_abandon_time": sum(abandon_time - start for start, abandon_time, *_ in abandons) / len(abandons),
+        "reclaim_samples": len(reclaim),
+        "reclaim_p50": percentile(reclaim, 50),
+        "reclaim_p95": percentile(reclaim, 95),
+        "ttft_after_abandon": sum(after) / len(after) if after else 0,
+        "ttft_other": sum(other) / len(other) if other else 0,
+    }
+
+@dataclass
+class LiveMetrics:
+    """Momentaufnahme der Live-Kennzahlen (gleitendes Fenster, Fehler kumuliert)"""
+    elapsed: float
+    remaining: float
+    in_flight: int
+    users: int
+    requests_per_second: float
+    ttft_p50: float
+    ttft_p95: float
+    tokens_per_second: float
+    completed: int
+    error_classes: dict = field(default_factory=dict)
+
+class LiveConsole:
+    """Aggregierte Live-Anzeige im Elternprozess
+    
+    Liest neue Request-Events inkrementell, zeigt in festem Takt eine
+    Statuszeile (laufende Requests, Requests/s, TTFT P50/P95, Tokens/s,
+    Fehler nach Klasse, Restzeit) und schreibt Einzel-Requests gebündelt in
+    eine optionale Logdatei. Im Quiet-Modus entfällt die Anzeige.
+    on_events erhält jeden neu gelesenen Event-Block (z.B. PromptStats.add_events).
+    """
+    def __init__(self, user_count, test_duration, start_time, active_flags, refresh_interval=1.0,
+                 quiet=False, log_file=None, window=10.0, on_events=None):
+        self.user_count = user_count
+        self.test_duration = test_duration
+        self.start_time = start_time
+        self.active_flags = active_flags
+        self.refresh_interval = refresh_interval
+        self.quiet = quiet
+        self.window = window
+        self.on_events = on_events
+        self.read_index = 0
+        self.recent = deque()
+        self.error_classes = {}
+        self.completed = 0
+        self.next_render = 0
+        self.interactive = sys.stdout.isatty()
+        self.rendered = False
+        self.log = None
+        if log_file:
+            write_header = not os.path.exists(log_file)
+            self.log = open(log_file, 'a', encoding='utf-8')
+            if write_header:
+                self.log.write("Zeitstempel,Benutzer,User_ID,Persona,Status,Antwortzeit,TTFT,Tokens\n")
+    
+    def update(self, new_events=None):
+        # Ohne übergebene Events inkrementell aus der gemeinsamen Liste lesen
+        if new_events is None:
+            new_events = request_events[self.read_index:]
+            self.read_index += len(new_events)
+        now = time.time()
+        if self.on_events and new_events:
+            self.on_events(new_events)
+        
+        log_lines = []
+        for start, end, ttft, error_class, tokens, persona_name, user_id, *_ in new_events:
+            self.recent.append((end, ttft, error_class, tokens))
+            if error_class:
+                self.error_classes[error_class] = self.error_classes.get(error_class, 0) + 1
+            else:
+                self.completed += 1
+            if self.log:
+                status = error_class or "ok"
+                log_lines.append(f"{datetime.fromtimestamp(end).isoformat(timespec='milliseconds')},{self.user_count},{user_id},{persona_name},{status},{end - start:.3f},{ttft:.3f},{tokens}\n")
+        if log_lines:
+            self.log.writelines(log_lines)
+            self.log.flush()
+        
+        while self.recent and self.recent[0][0] < now - self.window:
+            self.recent.popleft()
+        
+        if not self.quiet and now >= self.next_render:
+            self.render(now)
+            self.next_render = now + self.refresh_interval
+    
+    def metrics(self, now=None):
+        """Aktuelle Kennzahlen über das gleitende Fenster"""
+        now = now or time.time()
+        elapsed = now - self.start_time
+        span = min(self.window, max(elapsed, 1e-9))
+        successes = [(ttft, tokens) for _, ttft, error_class, tokens in self.recent if not error_class]
+        ttfts = [ttft for ttft, _ in successes]
+        return LiveMetrics(
+            elapsed=elapsed,
+            remaining=max(0, self.test_duration - elapsed),
+            in_flight=sum(self.active_flags),
+            users=self.user_count,
+            requests_per_second=len(self.recent) / span,
+            ttft_p50=percentile(ttfts, 50),
+            ttft_p95=percentile(ttfts, 95),
+            tokens_per_second=sum(tokens for _, tokens in successes) / span,
+            completed=self.completed,
+            error_classes=dict(self.error_classes)
+        )
+    
+    def render(self, now):
+        m = self.metrics(now)
+        errors = " ".join(f"{name}={count}" for name, count in sorted(m.error_classes.items())) or "0"
+        line = (f"[Live] {m.elapsed:4.0f}s Rest {m.remaining // 60:.0f}:{m.remaining % 60:02.0f} | "
+                f"aktiv {m.in_flight}/{m.users} | {m.requests_per_second:5.2f} req/s | "
+                f"TTFT P50 {m.ttft_p50:.2f}s P95 {m.ttft_p95:.2f}s | "
+                f"{m.tokens_per_second:6.1f} tok/s | "
+                f"OK {m.completed} | Fehler {errors}")
+        if self.interactive:
+            sys.stdout.write("\r\033[K" + line)
+            sys.stdout.flush()
+        else:
+            print(line)
+        self.rendered = True
+    
+    def end_line(self):
+        """Beendet die Live-Zeile, damit folgende Ausgaben in einer eigenen Zeile stehen"""
+        if self.rendered and self.interactive:
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+        self.rendered = False
+    
+    def close(self):
+        # Restliche Events ohne weitere Anzeige verarbeiten (Log, on_events)
+        self.quiet = True
+        self.update()
+        if self.log:
+            self.log.close()
+            self.log = None
+        self.end_line()
+
+class LinearTrend:
+    """Lineare Regression mit laufenden Summen (konstanter Speicher)"""
+    def __init__(self):
+        self.n = 0
+        self.sum_x = 0.0
+        self.sum_y = 0.0
+        self.sum_xy = 0.0
+        self.sum_xx = 0.0
+    
+    def add(self, x, y):
+        self.n += 1
+        self.sum_x += x
+        self.sum_y += y
+        self.sum_xy += x * y
+        self.sum_xx += x * x
+    
+    def slope(self):
+        denominator = self.n * self.sum_xx - self.sum_x ** 2
+        if self.n < 2 or denominator == 0:
+            return 0.0
+        return (self.n * self.sum_xy - self.sum_x * self.sum_y) / denominator
+
+class SoakAggregator:
+    """Rollierende Aggregation für Dauertests
+    
+    Requests werden in Histogramme pro Snapshot-Fenster einsortiert; jedes
+    Fenster wird als Zeile auf die Platte geschrieben und danach verworfen.
+    Die erste Phase (baseline_duration) dient als Referenz für die
+    Drift-Erkennung, Trends werden per laufender Regression geschätzt.
+    """
+    SNAPSHOT_HEADER = ("Zeitstempel,Stunden,Requests,Fehler,Req_s,TTFT_P50,TTFT_P95,Antwort_P95,Tokens_s,"
+                       "CPU_P95,Memory_Max,Swap_Max,Drift_TTFT_P95_Prozent,Drift_Tokens_Prozent,Alarm\n")
+    
+    def __init__(self, start_time, snapshot_interval, baseline_duration, drift_threshold, output_file):
+        self.start_time = start_time
+        self.snapshot_interval = snapshot_interval
+        self.baseline_duration = baseline_duration
+        self.drift_threshold = drift_threshold
+        self.output_file = output_file
+        self.window_start = start_time
+        self._reset_window()
+        self.total_ttft = LatencyHistogram()
+        self.total_latency = LatencyHistogram()
+        self.total_errors = {}
+        self.total_tokens = 0
+        self.baseline_ttft = LatencyHistogram()
+        self.baseline_tokens = 0
+        self.baseline_complete = False
+        self.ttft_trend = LinearTrend()
+        self.tokens_trend = LinearTrend()
+        self.snapshots = 0
+        self.alerts = 0
+        self.last_alert = None
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(self.SNAPSHOT_HEADER)
+    
+    def _reset_window(self):
+        self.window_ttft = LatencyHistogram()
+        self.window_latency = LatencyHistogram()
+        self.window_errors = 0
+        self.window_tokens = 0
+    
+    def add(self, events):
+        for start, end, ttft, error_class, tokens, *_ in events:
+            if error_class:
+                self.window_errors += 1
+                self.total_errors[error_class] = self.total_errors.get(error_class, 0) + 1
+                continue
+            self.window_ttft.add(ttft)
+            self.window_latency.add(end - start)
+            self.window_tokens += tokens
+    
+    def maybe_snapshot(self, now, monitor):
+        """Schließt das Fenster ab, wenn das Snapshot-Intervall erreicht ist; gibt ggf. eine Alarmmeldung zurück"""
+        if now - self.window_start < self.snapshot_interval:
+            return None
+        return self.snapshot(now, monitor)
+    
+    def snapshot(self, now, monitor, final=False):
+        """Schreibt das aktuelle Fenster; das abschließende Teilfenster (final) löst keinen Alarm aus und zählt nicht zum Trend"""
+        window_seconds = max(now - self.window_start, 1e-9)
+        hours = (now - self.start_time) / 3600
+        ttft_p95 = self.window_ttft.percentile(95)
+        tokens_per_second = self.window_tokens / window_seconds
+        
+        # Systemwerte des Fensters aus dem Ringpuffer des Monitors
+        samples = [sample for sample in list(monitor.samples) if sample.timestamp >= self.window_start]
+        cpu_p95 = percentile([sample.cpu for sample in samples], 95)
+        memory_max = max((sample.memory for sample in samples), default=0)
+        swap_max = max((sample.swap for sample in samples), default=0)
+        
+        alert = ""
+        drift_ttft = drift_tokens = 0.0
+        if final:
+            pass
+        elif self.baseline_complete:
+            baseline_p95 = self.baseline_ttft.percentile(95)
+            baseline_tps = self.baseline_tokens / self.baseline_duration
+            if baseline_p95 > 0 and self.window_ttft.count:
+                drift_ttft = (ttft_p95 / baseline_p95 - 1) * 100
+            if baseline_tps > 0:
+                drift_tokens = (tokens_per_second / baseline_tps - 1) * 100
+            if drift_ttft > self.drift_threshold * 100 or -drift_tokens > self.drift_threshold * 100:
+                alert = (f"Drift nach {hours:.1f}h: P95 TTFT {drift_ttft:+.0f}%, "
+                         f"Tokens/s {drift_tokens:+.0f}% gegenüber der Referenzphase")
+                self.alerts += 1
+                self.last_alert = alert
+        else:
+            self.baseline_ttft.merge(self.window_ttft)
+            self.baseline_tokens += self.window_tokens
+            if now - self.start_time >= self.baseline_duration:
+                self.baseline_complete = True
+                self.baseline_duration = now - self.start_time
+        
+        if not final:
+            if self.window_ttft.count:
+                self.ttft_trend.add(hours, ttft_p95)
+            self.tokens_trend.add(hours, tokens_per_second)
+        
+        requests_in_window = self.window_ttft.count + self.window_errors
+        with open(self.output_file, 'a', encoding='utf-8') as f:
+            f.write(f"{datetime.fromtimestamp(now).isoformat(timespec='seconds')},{hours:.3f},{requests_in_window},"
+                    f"{self.window_errors},{requests_in_window / window_seconds:.3f},{self.window_ttft.percentile(50):.3f},"
+                    f"{ttft_p95:.3f},{self.window_latency.percentile(95):.3f},{tokens_per_second:.2f},"
+                    f"{cpu_p95:.1f},{memory_max:.1f},{swap_max:.1f},{drift_ttft:.1f},{drift_tokens:.1f},{1 if alert else 0}\n")
+        
+        self.total_ttft.merge(self.window_ttft)
+        self.total_latency.merge(self.window_latency)
+        self.total_tokens += self.window_tokens
+        self.snapshots += 1
+        self.window_start = now
+        self._reset_window()
+        return alert or None
+
+def drain_shared_lists():
+    """Entnimmt alle neuen Request-Events und leert die übrigen gemeinsamen Listen (konstanter Speicher)"""
+    count = len(request_events)
+    events = request_events[:count]
+    del request_events[:count]
+    for shared in (response_times, ttft_times, token_counts, request_timings, prefix_events, abandon_events):
+        del shared[:len(shared)]
+    return events
+
 def get_recommendation(avg_time, max_time, error_rate, cpu_usage, avg_ttft):
     """Erstellt eine Empfehlung basierend auf TTFT und anderen Metriken"""
     # Fehlerrate hat höchste Priorität
@@ -219,55 +1710,99 @@ def check_ollama_connection(base_url):
     except:
         return False
 
-def run_load_test(model, prompts, user_count, pause_min, pause_max, test_duration, base_url, gpu_name):
-    """Führt einen Load-Test mit einer bestimmten Anzahl von Benutzern durch"""
+def start_user_processes(processes, model, prompts, user_count, pause_min, pause_max, base_url, test_duration,
+                         params, seed, workload_name, batch_size, assignment, prefix_config, active_flags,
+                         timeouts=None, abandon_config=None):
+    """Startet einen Prozess pro simuliertem Benutzer und hängt ihn an processes an"""
+    shared_state = get_shared_state()
+    for user_id in range(user_count):
+        p = multiprocessing.Process(
+            target=ollama_chat_continuous, 
+            args=(model, prompts, user_id, pause_min, pause_max, base_url, test_duration, params,
+                  seed, user_count, workload_name, batch_size, assignment[user_id], prefix_config,
+                  active_flags, timeouts, abandon_config, shared_state)
+        )
+        p.start()
+        processes.append(p)
+        
+        # Kleine Verzögerung zwischen Starts zur Verteilung
+        time.sleep(0.1)
+
+def run_load_test(model, prompts, user_count, pause_min, pause_max, test_duration, base_url, gpu_name, params=None,
+                  seed=None, workload_name="generate", batch_size=1, monitor_interval=1.0, monitor_output=None,
+                  personas=None, prefix_config=None, refresh_interval=1.0, quiet=False, request_log=None,
+                  timeouts=None, abort_thresholds=None, verbose=True, on_update=None, abandon_config=None):
+    """Führt einen Load-Test mit einer bestimmten Anzahl von Benutzern durch
+    
+    on_update wird nach jeder Aktualisierung mit LiveMetrics aufgerufen;
+    verbose=False unterdrückt die Konsolenausgaben (Nutzung als Bibliothek).
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
     reset_counters()
+    abort_thresholds = abort_thresholds or DEFAULT_ABORT_THRESHOLDS
     
-    print(f"\n{'='*60}")
-    print(f"Test mit {user_count} Benutzern gestartet...")
-    print(f"Testdauer: {test_duration/60:.1f} Minuten")
-    print(f"{'='*60}")
+    log(f"\n{'='*60}")
+    log(f"Test mit {user_count} Benutzern gestartet...")
+    if workload_name != "generate":
+        log(f"Workload: {workload_name} ({WORKLOADS[workload_name].path})")
+    if batch_size > 1:
+        log(f"Batch-Größe: {batch_size} Dokumente pro Request")
+    if params:
+        log(f"Parameter: {format_params(params)}")
+    if abandon_config:
+        log(f"Client-Abbrüche: {abandon_config.probability * 100:.0f}% der Requests, {format_abandon_cutoff(abandon_config)}")
+    assignment = assign_personas(personas, user_count, seed) if personas else [None] * user_count
+    if personas:
+        mix = {persona.name: sum(1 for p in assignment if p is persona) for persona in personas}
+        log("Personas: " + ", ".join(f"{name} x{count}" for name, count in mix.items()))
+    log(f"Testdauer: {test_duration/60:.1f} Minuten")
+    log(f"{'='*60}")
     
     # System-Monitoring starten
-    monitor = SystemMonitor()
+    monitor = SystemMonitor(interval=monitor_interval)
     monitor.start_monitoring()
     
     processes = []
+    aborted = ""
     start_time = time.time()
+    # Ein Flag pro Benutzer (1 = Request läuft), jeder Prozess schreibt nur seinen Eintrag
+    active_flags = multiprocessing.Array('b', user_count, lock=False)
+    # Kennzahlen pro Prompt werden laufend aus den neu gelesenen Events fortgeschrieben
+    prompt_stats = PromptStats(prompts, personas) if batch_size == 1 else None
+    console = LiveConsole(user_count, test_duration, start_time, active_flags,
+                          refresh_interval, quiet, request_log,
+                          on_events=prompt_stats.add_events if prompt_stats else None)
     
     try:
         # Alle Benutzer gleichzeitig starten
-        for user_id in range(user_count):
-            p = multiprocessing.Process(
-                target=ollama_chat_continuous, 
-                args=(model, prompts, user_id, pause_min, pause_max, base_url, test_duration)
-            )
-            p.start()
-            processes.append(p)
-            
-            # Kleine Verzögerung zwischen Starts zur Verteilung
-            time.sleep(0.1)
+        start_user_processes(processes, model, prompts, user_count, pause_min, pause_max, base_url, test_duration,
+                             params, seed, workload_name, batch_size, assignment, prefix_config, active_flags,
+                             timeouts, abandon_config)
         
-        print(f"Alle {user_count} Benutzer gestartet. Warte {test_duration/60:.1f} Minuten...")
+        if not quiet:
+            log(f"Alle {user_count} Benutzer gestartet. Warte {test_duration/60:.1f} Minuten...")
         
-        # Überwachungsschleife mit Abbruchkriterium
+        # Überwachungsschleife mit Live-Anzeige und Abbruchkriterium
         check_interval = 30  # Prüfe alle 30 Sekunden
         next_check = time.time() + check_interval
         
         while any(p.is_alive() for p in processes):
-            time.sleep(1)
+            time.sleep(min(refresh_interval, 1))
+            console.update()
+            if on_update:
+                on_update(console.metrics())
             
-            # Alle 30 Sekunden Timeout-Rate prüfen
+            # Alle 30 Sekunden Fehlerraten pro Klasse prüfen
             if time.time() >= next_check:
-                total_requests = success_count.value + error_count.value
-                if total_requests >= 10:  # Mindestens 10 Requests für aussagekräftige Statistik
-                    timeout_rate = (error_count.value / total_requests) * 100
-                    print(f"[Zwischenstand] Requests: {total_requests}, Fehlerrate: {timeout_rate:.1f}%")
-                    
-                    if timeout_rate > 30:
-                        print(f"\n⚠️ ABBRUCH: Fehlerrate ({timeout_rate:.1f}%) überschreitet 30%!")
-                        print("System ist überlastet - Test wird abgebrochen.")
-                        break
+                exceeded = check_abort(console.error_classes, console.completed, abort_thresholds)
+                if exceeded:
+                    key, rate = exceeded
+                    console.close()
+                    label = "Fehlerrate" if key == "total" else f"Fehlerrate {key}"
+                    aborted = f"{label} {rate:.1f}% > {abort_thresholds[key]:g}%"
+                    log(f"\n⚠️ ABBRUCH: {label} ({rate:.1f}%) überschreitet {abort_thresholds[key]:g}%!")
+                    log("System ist überlastet - Test wird abgebrochen.")
+                    break
                 
                 next_check = time.time() + check_interval
         
@@ -280,7 +1815,8 @@ def run_load_test(model, prompts, user_count, pause_min, pause_max, test_duratio
         time.sleep(2)
             
     except KeyboardInterrupt:
-        print("\nTest abgebrochen...")
+        console.close()
+        log("\nTest abgebrochen...")
         terminate_processes(processes)
         return None
     finally:
@@ -288,36 +1824,52 @@ def run_load_test(model, prompts, user_count, pause_min, pause_max, test_duratio
         for p in processes:
             if p.is_alive():
                 p.terminate()
+        console.close()
     
     # System-Monitoring stoppen
-    monitor.stop_monitoring()
+    monitor.stop_monitoring(verbose)
+    if monitor_output:
+        monitor.export_samples(monitor_output, user_count, model, workload_name)
     actual_duration = time.time() - start_time
     
     # Ergebnisse auswerten
     times = list(response_times)
     ttft_list = list(ttft_times)
+    tokens = list(token_counts)
+    timings = list(request_timings)
+    events = list(request_events)
+    components = decompose_latency(timings)
+    error_breakdown = count_error_classes(events)
     total_requests = success_count.value + error_count.value
+    abandons = list(abandon_events)
     
-    if not times:
-        print(f"Keine erfolgreichen Requests in {user_count}-Benutzer-Test!")
+    # Schritte ohne Erfolge (nur Fehler oder nur Client-Abbrüche) liefern trotzdem
+    # Fehlerklassen, Abbruchgrund und Abbruch-Statistik
+    if not total_requests and not abandons:
+        log(f"Keine Requests in {user_count}-Benutzer-Test!")
         return None
+    if not times:
+        log(f"Keine erfolgreichen Requests in {user_count}-Benutzer-Test!")
     
     # Empfehlung generieren (jetzt basierend auf TTFT)
-    recommendation = get_recommendation(
-        sum(times) / len(times),
-        max(times),
-        (error_count.value / total_requests * 100) if total_requests > 0 else 0,
-        monitor.get_average_cpu(),
-        sum(ttft_list) / len(ttft_list) if ttft_list else 0
-    )
+    if total_requests:
+        recommendation = get_recommendation(
+            sum(times) / len(times) if times else 0,
+            max(times, default=0),
+            error_count.value / total_requests * 100,
+            monitor.get_average_cpu(),
+            sum(ttft_list) / len(ttft_list) if ttft_list else 0
+        )
+    else:
+        recommendation = "⚠️ Nur Abbrüche"
     
     result = TestResult(
         users=user_count,
         model=model,
         gpu=gpu_name,
-        avg_response_time=sum(times) / len(times),
-        max_response_time=max(times),
-        min_response_time=min(times),
+        avg_response_time=sum(times) / len(times) if times else 0,
+        max_response_time=max(times, default=0),
+        min_response_time=min(times, default=0),
         avg_ttft=sum(ttft_list) / len(ttft_list) if ttft_list else 0,
         error_rate=(error_count.value / total_requests * 100) if total_requests > 0 else 0,
         total_requests=total_requests,
@@ -326,50 +1878,879 @@ def run_load_test(model, prompts, user_count, pause_min, pause_max, test_duratio
         cpu_usage=monitor.get_average_cpu(),
         memory_usage=monitor.get_average_memory(),
         test_duration=actual_duration,
-        recommendation=recommendation
+        recommendation=recommendation,
+        tokens_per_second=sum(tokens) / actual_duration if actual_duration > 0 else 0,
+        params=dict(params or {}),
+        workload=workload_name,
+        p50_response_time=percentile(times, 50),
+        p95_response_time=percentile(times, 95),
+        p99_response_time=percentile(times, 99),
+        batch_size=batch_size,
+        docs_per_second=success_count.value * batch_size / actual_duration if actual_duration > 0 else 0,
+        queue_p50=percentile(components["queue"], 50),
+        queue_p95=percentile(components["queue"], 95),
+        load_p50=percentile(components["load"], 50),
+        load_p95=percentile(components["load"], 95),
+        prompt_eval_p50=percentile(components["prompt_eval"], 50),
+        prompt_eval_p95=percentile(components["prompt_eval"], 95),
+        eval_p50=percentile(components["eval"], 50),
+        eval_p95=percentile(components["eval"], 95),
+        effective_parallelism=estimate_parallelism(timings),
+        avg_service_time=sum(t[5] for t in timings) / len(timings) if timings else 0,
+        avg_queue_time=sum(components["queue"]) / len(components["queue"]) if timings else 0,
+        system_stats=monitor.get_summary(),
+        ttft_histogram=LatencyHistogram.from_values(ttft_list),
+        latency_histogram=LatencyHistogram.from_values(times),
+        error_breakdown=error_breakdown,
+        error_rates=error_class_rates(error_breakdown, total_requests),
+        timeline=build_timeline(events, start_time),
+        persona_stats=summarize_personas(events, assignment) if personas else {},
+        prefix_stats=summarize_prefix_cohorts(list(prefix_events), prefix_config.tokens if prefix_config else None),
+        prompt_stats=prompt_stats,
+        aborted=aborted,
+        abandoned_requests=len(abandons),
+        abandon_stats=summarize_abandonment(abandons, events)
     )
     
-    print(f"\nTest abgeschlossen:")
-    print(f"  Erfolgreiche Requests: {result.successful_requests}")
-    print(f"  Fehlgeschlagene Requests: {result.failed_requests}")
-    print(f"  Durchschnittliche Antwortzeit: {result.avg_response_time:.2f}s")
-    print(f"  Durchschnittliche TTFT: {result.avg_ttft:.2f}s")
-    print(f"  Maximale Antwortzeit: {result.max_response_time:.2f}s")
-    print(f"  Fehlerrate: {result.error_rate:.1f}%")
-    print(f"  CPU-Auslastung: {result.cpu_usage:.1f}%")
+    log(f"\nTest abgeschlossen:")
+    log(f"  Erfolgreiche Requests: {result.successful_requests}")
+    log(f"  Fehlgeschlagene Requests: {result.failed_requests}")
+    log(f"  Durchschnittliche Antwortzeit: {result.avg_response_time:.2f}s")
+    log(f"  Durchschnittliche TTFT: {result.avg_ttft:.2f}s")
+    log(f"  Maximale Antwortzeit: {result.max_response_time:.2f}s")
+    log(f"  Fehlerrate: {result.error_rate:.1f}%")
+    if abandons:
+        log(f"  Vom Client abgebrochen: {result.abandoned_requests} (nicht als Fehler gezählt)")
+    log(f"  P95 Antwortzeit: {result.p95_response_time:.2f}s")
+    log(f"  Durchsatz: {result.tokens_per_second:.1f} Tokens/s")
+    if workload_name == "embed":
+        log(f"  Dokumente/s: {result.docs_per_second:.1f}")
+    if timings:
+        log(f"  Latenz P50: Warteschlange {result.queue_p50:.2f}s, Laden {result.load_p50:.2f}s, "
+              f"Prompt-Eval {result.prompt_eval_p50:.2f}s, Generierung {result.eval_p50:.2f}s")
+        log(f"  Effektive Parallelität: {result.effective_parallelism}")
+    log(f"  CPU-Auslastung: {result.cpu_usage:.1f}%")
+    if "cpu" in result.system_stats:
+        log(f"  CPU P95/Max: {result.system_stats['cpu'][1]:.1f}% / {result.system_stats['cpu'][2]:.1f}%, "
+              f"heißester Kern max: {result.system_stats['cpu_core_max'][2]:.1f}%")
     
     return result
 
+@dataclass
+class LoadTestConfig:
+    """Konfiguration eines Load-Tests für die Nutzung als Bibliothek (entspricht den CLI-Parametern)"""
+    model: str
+    prompts: List[str]
+    users: int = 1
+    test_duration: float = 60
+    pause_min: float = 3.0
+    pause_max: float = 30.0
+    host: str = "127.0.0.1:11434"
+    gpu: str = "Unknown"
+    params: dict = field(default_factory=dict)
+    seed: int = None
+    workload: str = "generate"
+    batch_size: int = 1
+    personas: List[Persona] = None
+    prefix_config: PrefixConfig = None
+    timeouts: Timeouts = field(default_factory=Timeouts)
+    abort_thresholds: dict = field(default_factory=lambda: dict(DEFAULT_ABORT_THRESHOLDS))
+    abandon: AbandonConfig = None
+    monitor_interval: float = 1.0
+    refresh_interval: float = 1.0
+    request_log: str = None
+    verbose: bool = False
+    
+    @property
+    def base_url(self):
+        return self.host if self.host.startswith(('http://', 'https://')) else f"http://{self.host}"
+    
+    def validate(self):
+        if not self.prompts:
+            raise ValueError("Keine Prompts angegeben")
+        if self.workload not in WORKLOADS:
+            raise ValueError(f"Unbekannter Workload '{self.workload}' (erlaubt: {', '.join(WORKLOADS)})")
+        if self.users <= 0 or self.test_duration <= 0 or self.batch_size <= 0:
+            raise ValueError("users, test_duration und batch_size müssen größer als 0 sein")
+        if self.pause_min > self.pause_max:
+            raise ValueError("pause_min darf nicht größer als pause_max sein")
+        check_workload_params(self.workload, self.params)
+
+class LoadTestRunner:
+    """Programmatische Schnittstelle zu run_load_test ohne CLI und Konsolenausgaben
+    
+    on_update(LiveMetrics) wird während eines Schritts periodisch aufgerufen,
+    on_result(TestResult) nach jedem abgeschlossenen Schritt.
+    """
+    def __init__(self, config: LoadTestConfig, on_update=None, on_result=None):
+        config.validate()
+        self.config = config
+        self.on_update = on_update
+        self.on_result = on_result
+    
+    def run(self, users=None) -> TestResult:
+        """Führt einen Schritt aus; None, wenn kein Request abgeschlossen wurde"""
+        config = self.config
+        result = run_load_test(
+            model=config.model,
+            prompts=config.prompts,
+            user_count=users or config.users,
+            pause_min=config.pause_min,
+            pause_max=config.pause_max,
+            test_duration=config.test_duration,
+            base_url=config.base_url,
+            gpu_name=config.gpu,
+            params=config.params,
+            seed=config.seed,
+            workload_name=config.workload,
+            batch_size=config.batch_size,
+            monitor_interval=config.monitor_interval,
+            monitor_output=None,
+            personas=config.personas,
+            prefix_config=config.prefix_config,
+            refresh_interval=config.refresh_interval,
+            quiet=not config.verbose,
+            request_log=config.request_log,
+            timeouts=config.timeouts,
+            abort_thresholds=config.abort_thresholds,
+            verbose=config.verbose,
+            on_update=self.on_update,
+            abandon_config=config.abandon
+        )
+        if result and self.on_result:
+            self.on_result(result)
+        return result
+    
+    def run_steps(self, user_steps) -> List[TestResult]:
+        """Führt mehrere Schritte nacheinander aus (z.B. [5, 10, 15])"""
+        results = []
+        for users in user_steps:
+            result = self.run(users)
+            if result:
+                results.append(result)
+        return results
+
+def get_param_columns(results: List[TestResult]):
+    """Ermittelt die in den Ergebnissen verwendeten Sweep-Parameter"""
+    used = set()
+    for result in results:
+        used.update(result.params.keys())
+    return [name for name in SWEEP_PARAMS if name in used]
+
+@dataclass
+class CapacityPrediction:
+    """Vorhersage des Warteschlangenmodells für eine Benutzerzahl"""
+    users: int
+    throughput: float
+    response_time: float
+    ttft: float
+    ttft_spread: float
+    measured: bool
+
+def fit_service_model(results: List[TestResult]):
+    """Passt die Servicezeit linear an die mittlere Server-Auslastung an: S(m) = a + b * m
+    
+    Die mittlere Anzahl gleichzeitig bearbeiteter Requests folgt aus Little's
+    Law (Durchsatz x Servicezeit). Mit nur einem Messpunkt ist b = 0.
+    """
+    points = []
+    for result in results:
+        service = result.avg_service_time or result.avg_response_time
+        throughput = result.successful_requests / result.test_duration if result.test_duration > 0 else 0
+        if service > 0 and throughput > 0:
+            points.append((throughput * service, service))
+    if not points:
+        return None
+    if len(points) == 1 or len({round(m, 6) for m, _ in points}) == 1:
+        return sum(s for _, s in points) / len(points), 0.0
+    mean_m = sum(m for m, _ in points) / len(points)
+    mean_s = sum(s for _, s in points) / len(points)
+    slope = sum((m - mean_m) * (s - mean_s) for m, s in points) / sum((m - mean_m) ** 2 for m, _ in points)
+    slope = max(slope, 0.0)  # Servicezeit sinkt nicht mit steigender Last
+    return mean_s - slope * mean_m, slope
+
+def closed_network_metrics(users, think_time, servers, service_model):
+    """Löst das Maschinen-Reparateur-Modell (M/M/c//N) mit lastabhängiger Servicezeit
+    
+    Zustand k = Anzahl Requests am Server, Ankunftsrate (N - k) / Z,
+    Bedienrate min(k, c) / S(min(k, c)). Gibt (Durchsatz, Antwortzeit,
+    Wartezeit) zurück.
+    """
+    intercept, slope = service_model
+    
+    def service_rate(k):
+        active = min(k, servers)
+        return active / max(intercept + slope * active, 1e-9)
+    
+    if think_time <= 0:
+        # Ohne Denkpause sind immer alle Benutzer am Server
+        throughput = service_rate(users)
+        response_time = users / throughput
+        return throughput, response_time, response_time * max(users - servers, 0) / users
+    
+    # Stationäre Verteilung im Log-Raum (vermeidet Überläufe bei vielen Benutzern)
+    log_weights = [0.0]
+    for k in range(1, users + 1):
+        log_weights.append(log_weights[-1] + math.log((users - k + 1) / think_time) - math.log(service_rate(k)))
+    max_log = max(log_weights)
+    weights = [math.exp(w - max_log) for w in log_weights]
+    total = sum(weights)
+    probabilities = [w / total for w in weights]
+    
+    throughput = sum(p * service_rate(k) for k, p in enumerate(probabilities))
+    queue_length = sum(p * max(k - servers, 0) for k, p in enumerate(probabilities))
+    response_time = users / throughput - think_time
+    return throughput, response_time, queue_length / throughput
+
+def predict_capacity(results: List[TestResult], user_counts, think_time):
+    """Sagt Durchsatz, Antwortzeit und TTFT für (ungetestete) Benutzerzahlen voraus
+    
+    Die Unsicherheit (ttft_spread) ist die Spannweite der Vorhersagen über
+    Modellvarianten: Leave-one-out-Fits der Servicezeit und Parallelität +-1.
+    Schritte ohne erfolgreiche Requests fließen nicht in das Modell ein.
+    """
+    results = [result for result in results if result.successful_requests]
+    service_model = fit_service_model(results)
+    if service_model is None:
+        return []
+    servers = max(1, int(max(result.effective_parallelism for result in results)))
+    ttft_base = max(0.0, sum(result.avg_ttft - result.avg_queue_time for result in results) / len(results))
+    
+    variants = [(servers, service_model)]
+    if len(results) >= 3:
+        for i in range(len(results)):
+            loo_model = fit_service_model(results[:i] + results[i + 1:])
+            if loo_model:
+                variants.append((servers, loo_model))
+    variants.append((servers + 1, service_model))
+    if servers > 1:
+        variants.append((servers - 1, service_model))
+    
+    measured_users = {result.users for result in results}
+    predictions = []
+    for users in sorted(set(user_counts) | measured_users):
+        throughput, response_time, wait_time = closed_network_metrics(users, think_time, servers, service_model)
+        variant_ttfts = [closed_network_metrics(users, think_time, c, model)[2] + ttft_base for c, model in variants]
+        predictions.append(CapacityPrediction(
+            users=users,
+            throughput=throughput,
+            response_time=response_time,
+            ttft=wait_time + ttft_base,
+            ttft_spread=max(variant_ttfts) - min(variant_ttfts),
+            measured=users in measured_users
+        ))
+    return predictions
+
+def recommend_next_step(results: List[TestResult], candidates, think_time, attempted=()):
+    """Wählt die ungetestete Benutzerzahl mit der größten Vorhersage-Unsicherheit
+    
+    Bewertet wird die relative Spannweite (bezogen auf die vorhergesagte TTFT),
+    gewichtet mit dem Abstand zum nächsten gemessenen Schritt. Die absolute
+    Spannweite wächst mit der Benutzerzahl und würde sonst immer einen
+    Schritt am oberen Rand wählen. Bereits versuchte Schritte (auch
+    fehlgeschlagene ohne Ergebnis) werden nicht erneut vorgeschlagen.
+    """
+    measured = {result.users for result in results}
+    untested = [users for users in candidates if users not in measured and users not in attempted]
+    if not untested:
+        return None
+    predictions = [p for p in predict_capacity(results, untested, think_time) if not p.measured]
+    if not predictions:
+        return None
+    
+    def score(prediction):
+        relative_spread = prediction.ttft_spread / max(prediction.ttft, 1e-3)
+        distance = min(abs(prediction.users - users) for users in measured) if measured else 1
+        return (relative_spread * distance, prediction.users)
+    
+    return max(predictions, key=score).users
+
+def group_results(results: List[TestResult]):
+    """Gruppiert Ergebnisse nach Modell, Workload, Batch-Größe und Parametern"""
+    groups = {}
+    for result in results:
+        key = (result.model, result.workload, result.batch_size, tuple(sorted(result.params.items())))
+        groups.setdefault(key, []).append(result)
+    return groups
+
+def print_capacity_prediction(results: List[TestResult], candidates, think_time):
+    """Gibt die Vorhersage des Warteschlangenmodells pro Testgruppe aus"""
+    for (model, workload, batch_size, params), group in group_results(results).items():
+        predictions = predict_capacity(group, candidates, think_time)
+        if not predictions:
+            continue
+        
+        title = f"{model} / {workload}" + (f" / {format_params(dict(params))}" if params else "")
+        print(f"\n{'='*80}")
+        print(f"KAPAZITÄTSPROGNOSE (Warteschlangenmodell): {title}")
+        print(f"{'='*80}")
+        print(f"{'Benutzer':<8} {'Req/s':<8} {'Antwortzeit':<12} {'TTFT':<8} {'Unsicherheit':<13} {'Gemessen TTFT':<14}")
+        print(f"{'-'*8} {'-'*8} {'-'*12} {'-'*8} {'-'*13} {'-'*14}")
+        measured = {result.users: result for result in group}
+        for prediction in predictions:
+            measured_ttft = f"{measured[prediction.users].avg_ttft:.2f}" if prediction.measured else "-"
+            print(f"{prediction.users:<8} {prediction.throughput:<8.2f} {prediction.response_time:<12.2f} {prediction.ttft:<8.2f} {'±' + format(prediction.ttft_spread / 2, '.2f'):<13} {measured_ttft:<14}")
+        print(f"{'-'*80}")
+        
+        next_step = recommend_next_step(group, candidates, think_time)
+        if next_step:
+            print(f"  Empfohlener nächster Messpunkt: {next_step} Benutzer")
+
+def run_soak_test(model, prompts, user_count, pause_min, pause_max, soak_duration, base_url, gpu_name, params=None,
+                  seed=None, workload_name="generate", monitor_interval=1.0, personas=None, prefix_config=None,
+                  refresh_interval=1.0, quiet=False, request_log=None, snapshot_interval=300, baseline_duration=3600,
+                  drift_threshold=0.5, drift_stop=False, soak_output="soak.csv", timeouts=None,
+                  abort_thresholds=None):
+    """Führt einen Dauertest mit fester Last durch (konstanter Speicher, Snapshots, Drift-Erkennung)
+    
+    Die Abbruchlimits gelten pro 30-Sekunden-Fenster, damit eine Überlastung
+    nach Stunden nicht im Gesamtschnitt untergeht.
+    """
+    reset_counters()
+    abort_thresholds = abort_thresholds or DEFAULT_ABORT_THRESHOLDS
+    
+    print(f"\n{'='*60}")
+    print(f"Dauertest mit {user_count} Benutzern gestartet...")
+    print(f"Dauer: {soak_duration/3600:.1f} Stunden, Snapshot alle {snapshot_interval:.0f}s nach {soak_output}")
+    print(f"Referenzphase: {baseline_duration/60:.0f} Minuten, Drift-Schwelle: {drift_threshold*100:.0f}%")
+    print(f"{'='*60}")
+    
+    assignment = assign_personas(personas, user_count, seed) if personas else [None] * user_count
+    # Ringpuffer muss mindestens ein Snapshot-Fenster fassen
+    monitor = SystemMonitor(interval=monitor_interval,
+                            buffer_size=max(20000, int(snapshot_interval / monitor_interval) * 2))
+    monitor.start_monitoring()
+    
+    processes = []
+    start_time = time.time()
+    active_flags = multiprocessing.Array('b', user_count, lock=False)
+    console = LiveConsole(user_count, soak_duration, start_time, active_flags, refresh_interval, quiet, request_log)
+    aggregator = SoakAggregator(start_time, snapshot_interval, baseline_duration, drift_threshold, soak_output)
+    stopped_by_drift = False
+    aborted = ""
+    
+    try:
+        start_user_processes(processes, model, prompts, user_count, pause_min, pause_max, base_url, soak_duration,
+                             params, seed, workload_name, 1, assignment, prefix_config, active_flags, timeouts)
+        
+        check_interval = 30
+        next_check = time.time() + check_interval
+        checked_completed, checked_errors = 0, {}
+        
+        while any(p.is_alive() for p in processes):
+            time.sleep(min(refresh_interval, 1))
+            events = drain_shared_lists()
+            console.update(events)
+            aggregator.add(events)
+            
+            alert = aggregator.maybe_snapshot(time.time(), monitor)
+            if alert:
+                # Live-Anzeige und Request-Log laufen weiter; geschlossen wird erst im finally
+                console.end_line()
+                print(f"\n⚠️ ALARM: {alert}")
+                if drift_stop:
+                    print("Dauertest wird wegen Drift abgebrochen.")
+                    stopped_by_drift = True
+                    break
+            
+            # Fehlerraten pro Klasse im letzten Fenster prüfen
+            if time.time() >= next_check:
+                window_errors = {name: count - checked_errors.get(name, 0)
+                                 for name, count in console.error_classes.items()}
+                exceeded = check_abort(window_errors, console.completed - checked_completed, abort_thresholds)
+                if exceeded:
+                    key, rate = exceeded
+                    console.end_line()
+                    label = "Fehlerrate" if key == "total" else f"Fehlerrate {key}"
+                    aborted = f"{label} {rate:.1f}% > {abort_thresholds[key]:g}%"
+                    print(f"\n⚠️ ABBRUCH: {label} ({rate:.1f}%) überschreitet {abort_thresholds[key]:g}%!")
+                    print("System ist überlastet - Dauertest wird abgebrochen.")
+                    break
+                checked_completed, checked_errors = console.completed, dict(console.error_classes)
+                next_check = time.time() + check_interval
+        
+        for p in processes:
+            if p.is_alive():
+                p.terminate()
+        time.sleep(2)
+    except KeyboardInterrupt:
+        print("\nDauertest abgebrochen - bisherige Snapshots bleiben erhalten.")
+    finally:
+        for p in processes:
+            if p.is_alive():
+                p.terminate()
+        events = drain_shared_lists()
+        console.update(events)
+        console.close()
+        aggregator.add(events)
+        aggregator.snapshot(time.time(), monitor, final=True)
+    
+    monitor.stop_monitoring()
+    actual_duration = time.time() - start_time
+    
+    if not aggregator.total_latency.count:
+        print("Keine erfolgreichen Requests im Dauertest!")
+        return None
+    
+    failed = sum(aggregator.total_errors.values())
+    successful = aggregator.total_latency.count
+    total_requests = successful + failed
+    error_rate = failed / total_requests * 100
+    avg_ttft = aggregator.total_ttft.mean()
+    ttft_slope = aggregator.ttft_trend.slope()
+    tokens_slope = aggregator.tokens_trend.slope()
+    
+    print(f"\nDauertest abgeschlossen ({actual_duration/3600:.2f} Stunden, {aggregator.snapshots} Snapshots):")
+    print(f"  Requests: {total_requests} (Fehlerrate {error_rate:.1f}%)")
+    print(f"  P95 TTFT Referenzphase: {aggregator.baseline_ttft.percentile(95):.2f}s, gesamt: {aggregator.total_ttft.percentile(95):.2f}s")
+    print(f"  Trend P95 TTFT: {ttft_slope:+.3f}s pro Stunde")
+    print(f"  Trend Tokens/s: {tokens_slope:+.2f} pro Stunde")
+    print(f"  Drift-Alarme: {aggregator.alerts}" + (" (abgebrochen)" if stopped_by_drift else ""))
+    if aborted:
+        print(f"  Abgebrochen: {aborted}")
+    
+    result = TestResult(
+        users=user_count,
+        model=model,
+        gpu=gpu_name,
+        avg_response_time=aggregator.total_latency.mean(),
+        max_response_time=aggregator.total_latency.max,
+        min_response_time=aggregator.total_latency.min,
+        avg_ttft=avg_ttft,
+        error_rate=error_rate,
+        total_requests=total_requests,
+        successful_requests=successful,
+        failed_requests=failed,
+        cpu_usage=monitor.get_average_cpu(),
+        memory_usage=monitor.get_average_memory(),
+        test_duration=actual_duration,
+        recommendation=get_recommendation(aggregator.total_latency.mean(), aggregator.total_latency.max,
+                                          error_rate, monitor.get_average_cpu(), avg_ttft),
+        tokens_per_second=aggregator.total_tokens / actual_duration if actual_duration > 0 else 0,
+        params=dict(params or {}),
+        workload=workload_name,
+        p50_response_time=aggregator.total_latency.percentile(50),
+        p95_response_time=aggregator.total_latency.percentile(95),
+        p99_response_time=aggregator.total_latency.percentile(99),
+        docs_per_second=successful / actual_duration if actual_duration > 0 else 0,
+        system_stats=monitor.get_summary(),
+        ttft_histogram=aggregator.total_ttft,
+        latency_histogram=aggregator.total_latency,
+        error_breakdown=dict(aggregator.total_errors),
+        error_rates=error_class_rates(aggregator.total_errors, total_requests),
+        aborted=aborted
+    )
+    return result
+
 def print_results_table(results: List[TestResult]):
     """Gibt die Ergebnistabelle aus"""
     if not results:
         print("Keine Ergebnisse zum Anzeigen.")
         return
     
-    print(f"\n{'='*138}")
+    param_columns = get_param_columns(results)
+    param_width = sum(max(len(name), 8) + 1 for name in param_columns)
+    width = 158 + param_width
+    
+    print(f"\n{'='*width}")
     print("LOAD TEST ERGEBNISSE")
-    print(f"{'='*138}")
+    print(f"{'='*width}")
     
     # Header
-    print(f"{'Benutzer':<8} {'Modell':<15} {'GPU':<12} {'Avg. Zeit':<10} {'TTFT':<8} {'Max. Zeit':<10} {'Min. Zeit':<10} {'Fehlerrate':<11} {'CPU %':<8} {'Memory %':<10} {'Requests':<10} {'Empfehlung':<12}")
-    print(f"{'-'*8} {'-'*15} {'-'*12} {'-'*10} {'-'*8} {'-'*10} {'-'*10} {'-'*11} {'-'*8} {'-'*10} {'-'*10} {'-'*12}")
+    param_header = "".join(f"{name:<{max(len(name), 8)}} " for name in param_columns)
+    param_sep = "".join(f"{'-'*max(len(name), 8)} " for name in param_columns)
+    print(f"{'Benutzer':<8} {'Modell':<15} {'Workload':<9} {'GPU':<12} {param_header}{'Avg. Zeit':<10} {'TTFT':<8} {'Max. Zeit':<10} {'Min. Zeit':<10} {'Tokens/s':<9} {'Fehlerrate':<11} {'CPU %':<8} {'Memory %':<10} {'Requests':<10} {'Empfehlung':<12}")
+    print(f"{'-'*8} {'-'*15} {'-'*9} {'-'*12} {param_sep}{'-'*10} {'-'*8} {'-'*10} {'-'*10} {'-'*9} {'-'*11} {'-'*8} {'-'*10} {'-'*10} {'-'*12}")
     
     # Datenzeilen
     for result in results:
-        print(f"{result.users:<8} {result.model:<15} {result.gpu:<12} {result.avg_response_time:<10.2f} {result.avg_ttft:<8.2f} {result.max_response_time:<10.2f} {result.min_response_time:<10.2f} {result.error_rate:<11.1f} {result.cpu_usage:<8.1f} {result.memory_usage:<10.1f} {result.total_requests:<10} {result.recommendation:<12}")
+        param_values = "".join(f"{str(result.params.get(name, '-')):<{max(len(name), 8)}} " for name in param_columns)
+        print(f"{result.users:<8} {result.model:<15} {result.workload:<9} {result.gpu:<12} {param_values}{result.avg_response_time:<10.2f} {result.avg_ttft:<8.2f} {result.max_response_time:<10.2f} {result.min_response_time:<10.2f} {result.tokens_per_second:<9.1f} {result.error_rate:<11.1f} {result.cpu_usage:<8.1f} {result.memory_usage:<10.1f} {result.total_requests:<10} {result.recommendation:<12}")
+    
+    print(f"{'-'*width}")
+
+def print_sweep_summary(results: List[TestResult]):
+    """Zeigt pro Modell und Benutzerzahl die Kombination mit dem höchsten Durchsatz"""
+    if len({tuple(sorted(result.params.items())) for result in results}) < 2:
+        return
+    
+    best = {}
+    for result in results:
+        key = (result.model, result.workload, result.users)
+        if key not in best or result.tokens_per_second > best[key].tokens_per_second:
+            best[key] = result
+    
+    print("\nBESTE PARAMETER-KOMBINATION (nach Tokens/s)")
+    for (model, workload, users), result in sorted(best.items()):
+        print(f"  {model} / {workload} / {users} Benutzer: {format_params(result.params)} "
+              f"-> {result.tokens_per_second:.1f} Tokens/s, TTFT {result.avg_ttft:.2f}s")
+
+def print_latency_breakdown(results: List[TestResult]):
+    """Gibt die Zerlegung der Latenz (P50/P95 je Komponente) pro Schritt aus"""
+    breakdown_results = [result for result in results if result.effective_parallelism > 0]
+    if not breakdown_results:
+        return
+    
+    print(f"\n{'='*126}")
+    print("LATENZ-ZERLEGUNG (P50 / P95 in Sekunden)")
+    print(f"{'='*126}")
+    print(f"{'Benutzer':<8} {'Modell':<15} {'Workload':<9} {'Warteschlange':<15} {'Laden':<15} {'Prompt-Eval':<15} {'Generierung':<15} {'TTFT':<8} {'Parallelität':<12}")
+    print(f"{'-'*8} {'-'*15} {'-'*9} {'-'*15} {'-'*15} {'-'*15} {'-'*15} {'-'*8} {'-'*12}")
+    for result in breakdown_results:
+        queue = f"{result.queue_p50:.2f} / {result.queue_p95:.2f}"
+        load = f"{result.load_p50:.2f} / {result.load_p95:.2f}"
+        prompt_eval = f"{result.prompt_eval_p50:.2f} / {result.prompt_eval_p95:.2f}"
+        eval_time = f"{result.eval_p50:.2f} / {result.eval_p95:.2f}"
+        print(f"{result.users:<8} {result.model:<15} {result.workload:<9} {queue:<15} {load:<15} {prompt_eval:<15} {eval_time:<15} {result.avg_ttft:<8.2f} {result.effective_parallelism:<12}")
+    print(f"{'-'*126}")
+
+def print_persona_table(results: List[TestResult]):
+    """Gibt die Kennzahlen pro Persona und Schritt aus"""
+    persona_results = [result for result in results if result.persona_stats]
+    if not persona_results:
+        return
+    
+    print(f"\n{'='*100}")
+    print("ERGEBNISSE PRO PERSONA")
+    print(f"{'='*100}")
+    print(f"{'Benutzer':<8} {'Modell':<15} {'Persona':<18} {'Anzahl':<7} {'Requests':<9} {'Ø TTFT':<8} {'P95 TTFT':<9} {'Ø Zeit':<8} {'Fehlerrate':<10}")
+    print(f"{'-'*8} {'-'*15} {'-'*18} {'-'*7} {'-'*9} {'-'*8} {'-'*9} {'-'*8} {'-'*10}")
+    for result in persona_results:
+        for name, stats in result.persona_stats.items():
+            print(f"{result.users:<8} {result.model:<15} {name[:18]:<18} {stats['users']:<7} {stats['requests']:<9} {stats['avg_ttft']:<8.2f} {stats['p95_ttft']:<9.2f} {stats['avg_response_time']:<8.2f} {stats['error_rate']:<10.1f}")
+    print(f"{'-'*100}")
+
+def print_prefix_table(results: List[TestResult]):
+    """Gibt TTFT und Prompt-Eval für Cache-Hit- und Cache-Miss-Kohorten aus"""
+    prefix_results = [result for result in results if result.prefix_stats]
+    if not prefix_results:
+        return
+    
+    print(f"\n{'='*108}")
+    print("PROMPT-CACHE (Shared-Prefix-Workload)")
+    print(f"{'='*108}")
+    print(f"{'Benutzer':<8} {'Modell':<15} {'Kohorte':<12} {'Requests':<9} {'P50 TTFT':<9} {'P95 TTFT':<9} {'P50 Prompt-Eval':<16} {'P95 Prompt-Eval':<16} {'Ø Prompt-Tokens':<15}")
+    print(f"{'-'*8} {'-'*15} {'-'*12} {'-'*9} {'-'*9} {'-'*9} {'-'*16} {'-'*16} {'-'*15}")
+    for result in prefix_results:
+        for cohort, stats in result.prefix_stats.items():
+            print(f"{result.users:<8} {result.model:<15} {cohort:<12} {stats['requests']:<9} {stats['p50_ttft']:<9.3f} {stats['p95_ttft']:<9.3f} {stats['p50_prompt_eval']:<16.3f} {stats['p95_prompt_eval']:<16.3f} {stats['avg_prompt_eval_count']:<15.0f}")
+    print(f"{'-'*108}")
+
+def get_error_columns(results: List[TestResult]):
+    """Ermittelt alle in den Ergebnissen aufgetretenen Fehlerklassen"""
+    return sorted({name for result in results for name in result.error_breakdown})
+
+def print_error_table(results: List[TestResult]):
+    """Gibt die Fehlerrate pro Fehlerklasse und Schritt aus (in % aller Requests)"""
+    error_columns = get_error_columns(results)
+    if not error_columns:
+        return
+    
+    width = 32 + 15 * len(error_columns)
+    print(f"\n{'='*width}")
+    print("FEHLERKLASSEN (% aller Requests)")
+    print(f"{'='*width}")
+    print(f"{'Benutzer':<8} {'Modell':<15} {'Requests':<8}" + "".join(f" {name[:14]:<14}" for name in error_columns))
+    print(f"{'-'*8} {'-'*15} {'-'*8}" + f" {'-'*14}" * len(error_columns))
+    for result in results:
+        rates = "".join(
+            f" {f'{result.error_rates.get(name, 0):.1f} ({result.error_breakdown.get(name, 0)})':<14}"
+            for name in error_columns
+        )
+        print(f"{result.users:<8} {result.model[:15]:<15} {result.total_requests:<8}{rates}")
+    print(f"{'-'*width}")
+
+def print_abandon_table(results: List[TestResult]):
+    """Gibt Client-Abbrüche und die Freigabe der Kapazität für andere Benutzer aus"""
+    abandon_results = [result for result in results if result.abandon_stats]
+    if not abandon_results:
+        return
     
-    print(f"{'-'*138}")
+    print(f"\n{'='*118}")
+    print("CLIENT-ABBRÜCHE (Freigabe = Abbruch bis erstes Token eines wartenden Requests)")
+    print(f"{'='*118}")
+    print(f"{'Benutzer':<8} {'Modell':<15} {'Abgebrochen':<11} {'Ø Tokens':<9} {'Ø nach':<8} {'Messungen':<10} {'Freigabe P50':<13} {'Freigabe P95':<13} {'TTFT danach':<12} {'TTFT sonst':<11}")
+    print(f"{'-'*8} {'-'*15} {'-'*11} {'-'*9} {'-'*8} {'-'*10} {'-'*13} {'-'*13} {'-'*12} {'-'*11}")
+    for result in abandon_results:
+        stats = result.abandon_stats
+        # Ohne Messwerte "-" statt 0 anzeigen
+        reclaim_p50, reclaim_p95, ttft_after, ttft_other = (
+            f"{value:.3f}" if value else "-"
+            for value in (stats['reclaim_p50'], stats['reclaim_p95'], stats['ttft_after_abandon'], stats['ttft_other'])
+        )
+        print(f"{result.users:<8} {result.model[:15]:<15} {stats['abandoned']:<11} {stats['avg_chunks']:<9.1f} {stats['avg_abandon_time']:<8.2f} {stats['reclaim_samples']:<10} {reclaim_p50:<13} {reclaim_p95:<13} {ttft_after:<12} {ttft_other:<11}")
+    print(f"{'-'*118}")
+
+def print_prompt_table(results: List[TestResult], top_n=5):
+    """Gibt pro Schritt die langsamsten und variabelsten Prompts aus"""
+    prompt_results = [result for result in results if result.prompt_stats and result.prompt_stats.summaries()]
+    if not prompt_results or top_n <= 0:
+        return
+    
+    print(f"\n{'='*120}")
+    print(f"TEUERSTE PROMPTS (Top {top_n} nach P95-Antwortzeit und Variationskoeffizient)")
+    print(f"{'='*120}")
+    for result in prompt_results:
+        params = f", {format_params(result.params)}" if result.params else ""
+        for title, entries in (("Langsamste", result.prompt_stats.slowest(top_n)),
+                               ("Variabelste", result.prompt_stats.most_variable(top_n))):
+            if not entries:
+                continue
+            print(f"\n{title} Prompts - {result.users} Benutzer, {result.model} ({result.workload}{params}):")
+            print(f"{'Index':<6} {'Requests':<9} {'Fehler':<7} {'P50 TTFT':<9} {'P95 TTFT':<9} {'P50 Zeit':<9} {'P95 Zeit':<9} {'Ø Tokens':<9} {'VarK':<6} {'Prompt':<35}")
+            print(f"{'-'*6} {'-'*9} {'-'*7} {'-'*9} {'-'*9} {'-'*9} {'-'*9} {'-'*9} {'-'*6} {'-'*35}")
+            for entry in entries:
+                text = " ".join(entry["prompt"].split())
+                text = text if len(text) <= 35 else text[:32] + "..."
+                print(f"{entry['index']:<6} {entry['requests']:<9} {entry['errors']:<7} {entry['p50_ttft']:<9.2f} {entry['p95_ttft']:<9.2f} {entry['p50_response_time']:<9.2f} {entry['p95_response_time']:<9.2f} {entry['avg_tokens']:<9.0f} {entry['cv']:<6.2f} {text:<35}")
+    print(f"{'-'*120}")
+
+def save_prompt_stats(results: List[TestResult], filename: str):
+    """Speichert die Kennzahlen aller Prompts pro Schritt als CSV"""
+    try:
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write("Benutzer,Modell,Workload,Parameter,Prompt_Index,Requests,Fehler,P50_TTFT,P95_TTFT,P50_Antwortzeit,P95_Antwortzeit,Avg_Tokens,Variationskoeffizient,Prompt\n")
+            for result in results:
+                if not result.prompt_stats:
+                    continue
+                for entry in result.prompt_stats.summaries():
+                    text = " ".join(entry["prompt"].split()).replace('"', '""')
+                    f.write(f"{result.users},{result.model},{result.workload},{format_params(result.params)},{entry['index']},{entry['requests']},{entry['errors']},{entry['p50_ttft']:.3f},{entry['p95_ttft']:.3f},{entry['p50_response_time']:.3f},{entry['p95_response_time']:.3f},{entry['avg_tokens']:.1f},{entry['cv']:.3f},\"{text}\"\n")
+        print(f"Prompt-Statistik gespeichert in: {filename}")
+    except Exception as e:
+        print(f"Fehler beim Speichern der Prompt-Statistik: {e}")
+
+def print_system_table(results: List[TestResult]):
+    """Gibt Min/P95/Max der Systemressourcen pro Schritt aus"""
+    stats_results = [result for result in results if result.system_stats]
+    if not stats_results:
+        return
+    
+    columns = [("cpu", "CPU %"), ("cpu_core_max", "Kern max %"), ("memory", "Memory %"), ("swap", "Swap %"),
+               ("net_rx_mb_s", "RX MB/s"), ("net_tx_mb_s", "TX MB/s"), ("ctx_switches_s", "Ctx/s")]
+    width = 34 + 20 * len(columns)
+    print(f"\n{'='*width}")
+    print("SYSTEM-RESSOURCEN (Min / P95 / Max)")
+    print(f"{'='*width}")
+    print(f"{'Benutzer':<8} {'Modell':<15} {'Workload':<9} " + " ".join(f"{label:<19}" for _, label in columns))
+    print(f"{'-'*8} {'-'*15} {'-'*9} " + " ".join('-'*19 for _ in columns))
+    for result in stats_results:
+        cells = []
+        for metric, _ in columns:
+            low, p95, high = result.system_stats.get(metric, (0, 0, 0))
+            precision = 0 if metric == "ctx_switches_s" else 1
+            cells.append(f"{low:.{precision}f}/{p95:.{precision}f}/{high:.{precision}f}")
+        print(f"{result.users:<8} {result.model:<15} {result.workload:<9} " + " ".join(f"{cell:<19}" for cell in cells))
+    print(f"{'-'*width}")
+
+def print_embedding_table(results: List[TestResult]):
+    """Gibt die Ergebnistabelle des Embedding-Benchmarks aus (Batch-Größe x Benutzer)"""
+    embed_results = [result for result in results if result.workload == "embed"]
+    if not embed_results:
+        return
+    
+    print(f"\n{'='*110}")
+    print("EMBEDDING DURCHSATZ")
+    print(f"{'='*110}")
+    print(f"{'Modell':<15} {'Batch':<6} {'Benutzer':<8} {'Docs/s':<9} {'Tokens/s':<9} {'P50 Zeit':<9} {'P95 Zeit':<9} {'P99 Zeit':<9} {'Fehlerrate':<11} {'Requests':<10}")
+    print(f"{'-'*15} {'-'*6} {'-'*8} {'-'*9} {'-'*9} {'-'*9} {'-'*9} {'-'*9} {'-'*11} {'-'*10}")
+    for result in embed_results:
+        print(f"{result.model:<15} {result.batch_size:<6} {result.users:<8} {result.docs_per_second:<9.1f} {result.tokens_per_second:<9.1f} {result.p50_response_time:<9.3f} {result.p95_response_time:<9.3f} {result.p99_response_time:<9.3f} {result.error_rate:<11.1f} {result.total_requests:<10}")
+    print(f"{'-'*110}")
+    
+    best = {}
+    for result in embed_results:
+        if result.model not in best or result.docs_per_second > best[result.model].docs_per_second:
+            best[result.model] = result
+    for model, result in best.items():
+        print(f"  Bester Durchsatz {model}: Batch {result.batch_size}, {result.users} Benutzer "
+              f"-> {result.docs_per_second:.1f} Docs/s (P95 {result.p95_response_time:.3f}s)")
+
+# Farben für Diagrammserien im HTML-Report
+REPORT_COLORS = ("#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf")
+
+def svg_chart(series, title, x_label, y_label, log_x=False, hline=None, width=640, height=320):
+    """Erzeugt ein Liniendiagramm als Inline-SVG (ohne externe Abhängigkeiten)
+    
+    series ist eine Liste von (Name, [(x, y), ...]); hline ein optionales
+    (Wert, Beschriftung) für eine horizontale Linie, z.B. das SLO.
+    """
+    points = [(x, y) for _, data in series for x, y in data if not log_x or x > 0]
+    if not points:
+        return ""
+    left, right, top, bottom = 60, 150, 30, 45
+    plot_width, plot_height = width - left - right, height - top - bottom
+    
+    transform_x = (lambda x: math.log10(x)) if log_x else (lambda x: x)
+    x_values = [transform_x(x) for x, _ in points]
+    x_min, x_max = min(x_values), max(x_values)
+    y_max = max([y for _, y in points] + ([hline[0]] if hline else []))
+    x_span = (x_max - x_min) or 1
+    y_max = y_max * 1.05 or 1
+    
+    def to_px(x, y):
+        return (left + (transform_x(x) - x_min) / x_span * plot_width,
+                top + plot_height - y / y_max * plot_height)
+    
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="sans-serif" font-size="11">',
+             f'<text x="{width / 2}" y="16" text-anchor="middle" font-size="13" font-weight="bold">{html.escape(title)}</text>',
+             f'<rect x="{left}" y="{top}" width="{plot_width}" height="{plot_height}" fill="none" stroke="#999"/>']
+    
+    # Achsenbeschriftung mit je fünf Ticks
+    for i in range(5):
+        y_value = y_max * i / 4
+        _, py = to_px(points[0][0], y_value)
+        parts.append(f'<line x1="{left}" y1="{py:.1f}" x2="{left + plot_width}" y2="{py:.1f}" stroke="#eee"/>')
+        parts.append(f'<text x="{left - 5}" y="{py + 4:.1f}" text-anchor="end">{y_value:.3g}</text>')
+        x_value = x_min + x_span * i / 4
+        px = left + plot_width * i / 4
+        label = 10 ** x_value if log_x else x_value
+        parts.append(f'<text x="{px:.1f}" y="{top + plot_height + 15}" text-anchor="middle">{label:.3g}</text>')
+    parts.append(f'<text x="{left + plot_width / 2}" y="{height - 8}" text-anchor="middle">{html.escape(x_label)}</text>')
+    parts.append(f'<text x="14" y="{top + plot_height / 2}" text-anchor="middle" transform="rotate(-90 14 {top + plot_height / 2})">{html.escape(y_label)}</text>')
+    
+    if hline:
+        _, py = to_px(points[0][0], hline[0])
+        parts.append(f'<line x1="{left}" y1="{py:.1f}" x2="{left + plot_width}" y2="{py:.1f}" stroke="#d62728" stroke-dasharray="6,4"/>')
+        parts.append(f'<text x="{left + plot_width - 4}" y="{py - 4:.1f}" text-anchor="end" fill="#d62728">{html.escape(hline[1])}</text>')
+    
+    for number, (name, data) in enumerate(series):
+        color = REPORT_COLORS[number % len(REPORT_COLORS)]
+        coords = " ".join(f"{px:.1f},{py:.1f}" for px, py in (to_px(x, y) for x, y in data if not log_x or x > 0))
+        if coords:
+            parts.append(f'<polyline points="{coords}" fill="none" stroke="{color}" stroke-width="1.5"/>')
+        legend_y = top + 12 + number * 14
+        parts.append(f'<rect x="{left + plot_width + 10}" y="{legend_y - 8}" width="10" height="10" fill="{color}"/>')
+        parts.append(f'<text x="{left + plot_width + 24}" y="{legend_y}">{html.escape(name[:22])}</text>')
+    parts.append('</svg>')
+    return "\n".join(parts)
+
+def result_label(result: TestResult):
+    """Kurzbezeichnung eines Schritts für Diagrammlegenden"""
+    label = f"{result.users} Ben."
+    if result.workload != "generate":
+        label += f" {result.workload}"
+    if result.batch_size > 1:
+        label += f" B{result.batch_size}"
+    return label
+
+def generate_html_report(results: List[TestResult], filename: str, slo_ttft: float):
+    """Schreibt einen eigenständigen HTML-Report (Inline-SVG, offline lesbar)
+    
+    Alle Diagramme basieren auf Histogrammen und verdichteten Zeitreihen,
+    die Dateigröße hängt daher nicht von der Anzahl der Requests ab.
+    """
+    sections = []
+    for (model, workload, batch_size, params), group in group_results(results).items():
+        title = f"{model} / {workload}" + (f" / Batch {batch_size}" if batch_size > 1 else "") + (f" / {format_params(dict(params))}" if params else "")
+        charts = []
+        
+        ttft_cdfs = [(result_label(r), [(x, y * 100) for x, y in r.ttft_histogram.cdf()]) for r in group if r.ttft_histogram]
+        latency_cdfs = [(result_label(r), [(x, y * 100) for x, y in r.latency_histogram.cdf()]) for r in group if r.latency_histogram]
+        charts.append(svg_chart(ttft_cdfs, "TTFT-Verteilung (CDF)", "TTFT in s (log)", "Anteil %", log_x=True))
+        charts.append(svg_chart(latency_cdfs, "Antwortzeit-Verteilung (CDF)", "Antwortzeit in s (log)", "Anteil %", log_x=True))
+        
+        users = sorted(group, key=lambda r: r.users)
+        charts.append(svg_chart(
+            [("Tokens/s", [(r.users, r.tokens_per_second) for r in users])],
+            "Durchsatz vs. Benutzer", "Benutzer", "Tokens/s"))
+        charts.append(svg_chart(
+            [("Requests/s", [(r.users, r.successful_requests / r.test_duration if r.test_duration > 0 else 0) for r in users])],
+            "Requests/s vs. Benutzer", "Benutzer", "Requests/s"))
+        charts.append(svg_chart(
+            [("Ø TTFT", [(r.users, r.avg_ttft) for r in users]),
+             ("P95 TTFT", [(r.users, r.ttft_histogram.percentile(95) if r.ttft_histogram else 0) for r in users]),
+             ("P95 Antwortzeit", [(r.users, r.p95_response_time) for r in users])],
+            "Latenz vs. Benutzer", "Benutzer", "Sekunden", hline=(slo_ttft, f"SLO TTFT {slo_ttft:g}s")))
+        charts.append(svg_chart(
+            [(result_label(r), [(t, rps) for t, rps, _, _, _ in r.timeline]) for r in group],
+            "Requests/s über die Zeit", "Sekunden seit Schrittbeginn", "Requests/s"))
+        charts.append(svg_chart(
+            [(result_label(r), [(t, ttft) for t, _, _, ttft, _ in r.timeline if ttft > 0]) for r in group],
+            "Ø TTFT über die Zeit", "Sekunden seit Schrittbeginn", "TTFT in s", hline=(slo_ttft, "SLO")))
+        
+        error_classes = sorted({name for r in group for name in r.error_breakdown})
+        error_rows = "".join(
+            f"<tr><td>{r.users}</td><td>{r.failed_requests}</td><td>{r.error_rate:.1f}%</td>"
+            + "".join(f"<td>{r.error_breakdown.get(name, 0)}</td>" for name in error_classes) + "</tr>"
+            for r in users
+        )
+        error_table = (
+            "<table><tr><th>Benutzer</th><th>Fehler</th><th>Fehlerrate</th>"
+            + "".join(f"<th>{html.escape(name)}</th>" for name in error_classes)
+            + f"</tr>{error_rows}</table>"
+        )
+        
+        summary_rows = "".join(
+            f"<tr><td>{r.users}</td><td>{r.total_requests}</td><td>{r.avg_ttft:.2f}</td>"
+            f"<td>{r.ttft_histogram.percentile(95) if r.ttft_histogram else 0:.2f}</td><td>{r.p95_response_time:.2f}</td>"
+            f"<td>{r.tokens_per_second:.1f}</td><td>{r.error_rate:.1f}</td><td>{html.escape(r.recommendation)}</td></tr>"
+            for r in users
+        )
+        summary_table = (
+            "<table><tr><th>Benutzer</th><th>Requests</th><th>Ø TTFT</th><th>P95 TTFT</th>"
+            "<th>P95 Antwortzeit</th><th>Tokens/s</th><th>Fehlerrate %</th><th>Empfehlung</th></tr>"
+            f"{summary_rows}</table>"
+        )
+        
+        persona_rows = "".join(
+            f"<tr><td>{r.users}</td><td>{html.escape(name)}</td><td>{stats['users']}</td><td>{stats['requests']}</td>"
+            f"<td>{stats['avg_ttft']:.2f}</td><td>{stats['p95_ttft']:.2f}</td><td>{stats['error_rate']:.1f}</td></tr>"
+            for r in users for name, stats in r.persona_stats.items()
+        )
+        persona_table = (
+            "<h3>Personas</h3><table><tr><th>Benutzer</th><th>Persona</th><th>Anzahl</th><th>Requests</th>"
+            f"<th>Ø TTFT</th><th>P95 TTFT</th><th>Fehlerrate %</th></tr>{persona_rows}</table>"
+        ) if persona_rows else ""
+        
+        sections.append(
+            f"<h2>{html.escape(title)}</h2>{summary_table}"
+            f"<div class='charts'>{''.join(charts)}</div>"
+            f"<h3>Fehler nach Klasse</h3>{error_table}{persona_table}"
+        )
+    
+    document = f"""<!DOCTYPE html>
+<html lang="de"><head><meta charset="utf-8"><title>Ollama Load Test Report</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; color: #222; }}
+table {{ border-collapse: collapse; margin: 1em 0; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; text-align: right; }}
+th {{ background: #f4f4f4; }}
+.charts svg {{ margin: 0.5em; border: 1px solid #eee; }}
+</style></head><body>
+<h1>Ollama Load Test Report</h1>
+<p>Erstellt: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} &middot; GPU: {html.escape(results[0].gpu) if results else '-'} &middot; SLO TTFT: {slo_ttft:g}s</p>
+{''.join(sections)}
+</body></html>
+"""
+    try:
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(document)
+        print(f"HTML-Report gespeichert in: {filename}")
+    except Exception as e:
+        print(f"Fehler beim Speichern des Reports: {e}")
 
 def save_results_to_file(results: List[TestResult], filename: str):
     """Speichert Ergebnisse in eine CSV-Datei"""
+    param_columns = get_param_columns(results)
+    system_header = "".join(f"{metric}_min,{metric}_p95,{metric}_max," for metric in SYSTEM_METRICS)
+    error_columns = get_error_columns(results)
+    error_header = "".join(f"Fehler_{name}," for name in error_columns)
     try:
         with open(filename, 'w', encoding='utf-8') as f:
             # CSV-Header
-            f.write("Benutzer,Modell,GPU,Avg_Antwortzeit,Avg_TTFT,Max_Antwortzeit,Min_Antwortzeit,Fehlerrate,CPU_Prozent,Memory_Prozent,Total_Requests,Erfolgreiche_Requests,Fehlgeschlagene_Requests,Testdauer,Empfehlung\n")
+            param_header = "".join(f"{name}," for name in param_columns)
+            f.write(f"Benutzer,Modell,Workload,GPU,{param_header}Batch,Avg_Antwortzeit,Avg_TTFT,Max_Antwortzeit,Min_Antwortzeit,P50_Antwortzeit,P95_Antwortzeit,P99_Antwortzeit,Tokens_pro_Sekunde,Docs_pro_Sekunde,Queue_P50,Queue_P95,Load_P50,Load_P95,Prompt_Eval_P50,Prompt_Eval_P95,Eval_P50,Eval_P95,Eff_Parallelitaet,Fehlerrate,{error_header}CPU_Prozent,Memory_Prozent,{system_header}Total_Requests,Erfolgreiche_Requests,Fehlgeschlagene_Requests,Abgebrochene_Requests,Freigabe_P50,Freigabe_P95,Testdauer,Empfehlung\n")
             
             # Datenzeilen
             for result in results:
-                f.write(f"{result.users},{result.model},{result.gpu},{result.avg_response_time:.3f},{result.avg_ttft:.3f},{result.max_response_time:.3f},{result.min_response_time:.3f},{result.error_rate:.2f},{result.cpu_usage:.2f},{result.memory_usage:.2f},{result.total_requests},{result.successful_requests},{result.failed_requests},{result.test_duration:.1f},{result.recommendation}\n")
+                param_values = "".join(f"{result.params.get(name, '')}," for name in param_columns)
+                system_values = "".join(
+                    ",".join(f"{value:.2f}" for value in result.system_stats[metric]) + "," if metric in result.system_stats else ",,,"
+                    for metric in SYSTEM_METRICS
+                )
+                error_values = "".join(f"{result.error_rates.get(name, 0):.2f}," for name in error_columns)
+                f.write(f"{result.users},{result.model},{result.workload},{result.gpu},{param_values}{result.batch_size},{result.avg_response_time:.3f},{result.avg_ttft:.3f},{result.max_response_time:.3f},{result.min_response_time:.3f},{result.p50_response_time:.3f},{result.p95_response_time:.3f},{result.p99_response_time:.3f},{result.tokens_per_second:.2f},{result.docs_per_second:.2f},{result.queue_p50:.3f},{result.queue_p95:.3f},{result.load_p50:.3f},{result.load_p95:.3f},{result.prompt_eval_p50:.3f},{result.prompt_eval_p95:.3f},{result.eval_p50:.3f},{result.eval_p95:.3f},{result.effective_parallelism},{result.error_rate:.2f},{error_values}{result.cpu_usage:.2f},{result.memory_usage:.2f},{system_values}{result.total_requests},{result.successful_requests},{result.failed_requests},{result.abandoned_requests},{result.abandon_stats.get('reclaim_p50', 0):.3f},{result.abandon_stats.get('reclaim_p95', 0):.3f},{result.test_duration:.1f},{result.recommendation}\n")
         
         print(f"\nErgebnisse gespeichert in: {filename}")
     except Exception as e:
@@ -397,6 +2778,77 @@ def main():
                        help="Ollama Host und Port (Standard: 127.0.0.1:11434)")
     parser.add_argument("--output", type=str, default=None, 
                        help="Dateiname für CSV-Export (optional)")
+    parser.add_argument("--sweep", type=str, default=None, 
+                       help="Parameter-Matrix, z.B. 'num_ctx=2048,8192;num_predict=128,512' "
+                            f"(erlaubt: {', '.join(SWEEP_PARAMS)})")
+    parser.add_argument("--workload", type=str, default="generate", 
+                       help=f"Endpunkt(e), kommagetrennt: {', '.join(WORKLOADS)} (Standard: generate)")
+    parser.add_argument("--batch-sizes", type=str, default="1", 
+                       help="Batch-Größen für den embed-Workload, kommagetrennt (Standard: 1)")
+    parser.add_argument("--predict", action="store_true", 
+                       help="Kapazitätsprognose per Warteschlangenmodell für ungetestete Benutzerzahlen")
+    parser.add_argument("--adaptive", type=int, default=None, 
+                       help="Nur N Schritte messen; jeder weitere Schritt wird nach größter Prognose-Unsicherheit gewählt")
+    parser.add_argument("--monitor-interval", type=float, default=1.0, 
+                       help="Sampling-Intervall des System-Monitors in Sekunden, z.B. 0.25 (Standard: 1.0)")
+    parser.add_argument("--monitor-output", type=str, default=None, 
+                       help="CSV-Datei für alle System-Samples mit Zeitstempel (optional)")
+    parser.add_argument("--report", type=str, default=None, 
+                       help="Dateiname für einen eigenständigen HTML-Report (optional)")
+    parser.add_argument("--slo-ttft", type=float, default=5.0, 
+                       help="TTFT-Zielwert in Sekunden, im Report als Linie markiert (Standard: 5.0)")
+    parser.add_argument("--personas", type=str, default=None, 
+                       help="JSON-Datei mit Persona-Definitionen (Prompts, Denkpausen-Verteilung, Gewicht)")
+    parser.add_argument("--prefix-count", type=int, default=0, 
+                       help="Anzahl geteilter Präfixe (System-Prompt/RAG-Vorspann) für den Prompt-Cache-Test (Standard: 0 = aus)")
+    parser.add_argument("--prefix-tokens", type=int, default=1000, 
+                       help="Ungefähre Länge jedes Präfixes in Tokens (Standard: 1000)")
+    parser.add_argument("--prefix-reuse", type=float, default=0.8, 
+                       help="Anteil der Requests mit geteiltem Präfix, Rest mit einmaligem Präfix (Standard: 0.8)")
+    parser.add_argument("--refresh", type=float, default=1.0, 
+                       help="Aktualisierungsintervall der Live-Anzeige in Sekunden (Standard: 1.0)")
+    parser.add_argument("--quiet", action="store_true", 
+                       help="Keine Live-Anzeige (z.B. für CI), nur Zusammenfassungen")
+    parser.add_argument("--request-log", type=str, default=None, 
+                       help="CSV-Datei, in die jeder Request gebündelt protokolliert wird (optional)")
+    parser.add_argument("--soak", type=float, default=None, 
+                       help="Dauertest: feste Last mit --users Benutzern für die angegebene Anzahl Stunden")
+    parser.add_argument("--snapshot-interval", type=float, default=300, 
+                       help="Dauertest: Sekunden pro Snapshot-Fenster (Standard: 300)")
+    parser.add_argument("--soak-baseline", type=float, default=3600, 
+                       help="Dauertest: Dauer der Referenzphase in Sekunden (Standard: 3600 = erste Stunde)")
+    parser.add_argument("--drift-threshold", type=float, default=0.5, 
+                       help="Dauertest: Alarm bei P95-TTFT-Anstieg oder Tokens/s-Abfall über diesem Anteil (Standard: 0.5 = 50%%)")
+    parser.add_argument("--drift-stop", action="store_true", 
+                       help="Dauertest: bei Drift-Alarm abbrechen statt nur zu warnen")
+    parser.add_argument("--soak-output", type=str, default=None, 
+                       help="Dauertest: CSV-Datei für Snapshots (Standard: automatischer Dateiname)")
+    parser.add_argument("--connect-timeout", type=float, default=10.0, 
+                       help="Limit für den Verbindungsaufbau in Sekunden (0 = kein Limit)")
+    parser.add_argument("--ttft-timeout", type=float, default=120.0, 
+                       help="Limit bis zum ersten Token in Sekunden (0 = kein Limit)")
+    parser.add_argument("--stall-timeout", type=float, default=30.0, 
+                       help="Maximale Pause zwischen zwei Stream-Chunks in Sekunden (0 = kein Limit)")
+    parser.add_argument("--request-timeout", type=float, default=0.0, 
+                       help="Gesamt-Deadline pro Request in Sekunden (Standard: 0 = kein Limit)")
+    parser.add_argument("--abort-thresholds", type=str, default="total=30", 
+                       help="Abbruch bei Fehlerrate pro Klasse in %%, z.B. 'total=30,http_5xx=10,stall=5'")
+    parser.add_argument("--abandon-prob", type=float, default=0.0, 
+                       help="Anteil der Requests, die der Client vorzeitig abbricht (0-1, Standard: 0)")
+    parser.add_argument("--abandon-after-tokens", type=int, default=0, 
+                       help="Abbruch nach so vielen empfangenen Tokens")
+    parser.add_argument("--abandon-after-seconds", type=float, default=0.0, 
+                       help="Abbruch nach so vielen Sekunden (auch vor dem ersten Token)")
+    parser.add_argument("--top-prompts", type=int, default=5, 
+                       help="Anzahl der langsamsten/variabelsten Prompts pro Schritt in der Ausgabe (0 = aus)")
+    parser.add_argument("--prompt-stats-output", type=str, default=None, 
+                       help="CSV-Datei mit Kennzahlen aller Prompts pro Schritt (optional)")
+    parser.add_argument("--seed", type=int, default=None, 
+                       help="Seed für reproduzierbare Prompt-Auswahl und Pausenzeiten (optional)")
+    parser.add_argument("--export-schedule", type=str, default=None, 
+                       help="Exportiert den vollständigen Request-Schedule als CSV (benötigt --seed)")
+    parser.add_argument("--ollama-seed", type=int, default=None, 
+                       help="Seed für das Sampling von Ollama (options.seed, optional)")
     
     args = parser.parse_args()
     
@@ -407,6 +2859,26 @@ def main():
         print("Fehler: Keine gültigen Modelle angegeben!")
         return
     
+    # Workloads aus kommagetrennter Liste extrahieren
+    workloads = [name.strip() for name in args.workload.split(',') if name.strip()]
+    unknown = [name for name in workloads if name not in WORKLOADS]
+    if not workloads or unknown:
+        print(f"Fehler: Unbekannte Workload(s) {', '.join(unknown)} (erlaubt: {', '.join(WORKLOADS)})")
+        return
+    
+    # Batch-Größen für den Embedding-Benchmark
+    try:
+        batch_sizes = [int(size) for size in args.batch_sizes.split(',') if size.strip()]
+    except ValueError:
+        print("Fehler: batch-sizes muss eine kommagetrennte Liste von Ganzzahlen sein!")
+        return
+    if not batch_sizes or min(batch_sizes) <= 0:
+        print("Fehler: batch-sizes müssen größer als 0 sein!")
+        return
+    if batch_sizes != [1] and "embed" not in workloads:
+        print("Fehler: --batch-sizes wird nur mit --workload embed unterstützt!")
+        return
+    
     # Base URL aus Host-Parameter erstellen
     if not args.host.startswith(('http://', 'https://')):
         base_url = f"http://{args.host}"
@@ -422,6 +2894,74 @@ def main():
         print("Fehler: users und step-size müssen größer als 0 sein!")
         return
     
+    if args.prefix_count < 0 or args.prefix_tokens <= 0 or not 0 <= args.prefix_reuse <= 1:
+        print("Fehler: prefix-count >= 0, prefix-tokens > 0 und prefix-reuse zwischen 0 und 1 erforderlich!")
+        return
+    
+    if args.soak is not None:
+        if args.soak <= 0 or args.snapshot_interval <= 0 or args.soak_baseline <= 0 or args.drift_threshold <= 0:
+            print("Fehler: soak, snapshot-interval, soak-baseline und drift-threshold müssen größer als 0 sein!")
+            return
+        if args.adaptive or args.sweep or args.batch_sizes != "1":
+            print("Fehler: Der Dauertest unterstützt kein --adaptive, --sweep oder --batch-sizes!")
+            return
+    
+    if args.refresh <= 0:
+        print("Fehler: refresh muss größer als 0 sein!")
+        return
+    
+    if min(args.connect_timeout, args.ttft_timeout, args.stall_timeout, args.request_timeout) < 0:
+        print("Fehler: Timeouts dürfen nicht negativ sein!")
+        return
+    timeouts = Timeouts(args.connect_timeout, args.ttft_timeout, args.stall_timeout, args.request_timeout)
+    
+    abandon_config = None
+    if args.abandon_prob:
+        if not 0 < args.abandon_prob <= 1 or args.abandon_after_tokens < 0 or args.abandon_after_seconds < 0:
+            print("Fehler: abandon-prob muss zwischen 0 und 1 liegen, abandon-after-* dürfen nicht negativ sein!")
+            return
+        if not args.abandon_after_tokens and not args.abandon_after_seconds:
+            print("Fehler: --abandon-prob benötigt --abandon-after-tokens und/oder --abandon-after-seconds!")
+            return
+        if args.soak is not None:
+            print("Fehler: Der Dauertest unterstützt keine Client-Abbrüche!")
+            return
+        abandon_config = AbandonConfig(args.abandon_prob, args.abandon_after_tokens, args.abandon_after_seconds)
+    
+    try:
+        abort_thresholds = parse_abort_thresholds(args.abort_thresholds)
+    except ValueError as e:
+        print(f"Fehler: {e}")
+        return
+    
+    if args.monitor_interval <= 0:
+        print("Fehler: monitor-interval muss größer als 0 sein!")
+        return
+    
+    if args.adaptive is not None and args.adaptive <= 0:
+        print("Fehler: adaptive muss größer als 0 sein!")
+        return
+    
+    if args.export_schedule and args.seed is None:
+        print("Fehler: --export-schedule benötigt --seed!")
+        return
+    
+    # Sweep-Matrix parsen
+    try:
+        matrix = parse_sweep_matrix(args.sweep) if args.sweep else {}
+    except ValueError as e:
+        print(f"Fehler: {e}")
+        return
+    if args.ollama_seed is not None and "seed" not in matrix:
+        matrix["seed"] = [args.ollama_seed]
+    try:
+        for workload_name in workloads:
+            check_workload_params(workload_name, matrix)
+    except ValueError as e:
+        print(f"Fehler: {e}")
+        return
+    sweep_plan = build_sweep_plan(matrix)
+    
     # Ollama-Verbindung prüfen
     print(f"Prüfe Verbindung zu Ollama ({base_url})...")
     if not check_ollama_connection(base_url):
@@ -441,15 +2981,79 @@ def main():
         print("Fehler: Keine Prompts in der Datei gefunden!")
         return
     
+    # Personas laden
+    personas = None
+    if args.personas:
+        try:
+            personas = load_personas(args.personas, prompts)
+        except (OSError, ValueError, KeyError, IndexError, json.JSONDecodeError) as e:
+            print(f"Fehler beim Laden der Personas: {e}")
+            return
+        # Teilweise angegebene uniform-Grenzen mit --pause-min/--pause-max kombinieren
+        for persona in personas:
+            spec = persona.think_time
+            if spec.get("distribution", "uniform") == "uniform" and \
+                    spec.get("min", args.pause_min) > spec.get("max", args.pause_max):
+                print(f"Fehler beim Laden der Personas: Persona '{persona.name}': min darf nicht größer als max sein")
+                return
+        print(f"✓ {len(personas)} Personas aus {args.personas} geladen")
+    
+    # Geteilte Präfixe für den Prompt-Cache-Test erzeugen
+    prefix_config = None
+    if args.prefix_count:
+        if batch_sizes != [1]:
+            print("Fehler: Shared-Prefix-Workload unterstützt keine Embedding-Batches!")
+            return
+        prefix_config = build_prefix_config(args.prefix_count, args.prefix_tokens, args.prefix_reuse, prompts, args.seed)
+    
     # Test-Parameter anzeigen
     print(f"\nSTARTE SCHRITTWEISES LOAD TESTING")
     print(f"Modelle: {', '.join(models)}")
+    print(f"Workloads: {', '.join(workloads)}")
+    if "embed" in workloads and batch_sizes != [1]:
+        print(f"Embedding-Batch-Größen: {batch_sizes}")
     print(f"GPU: {args.gpu}")
     print(f"Maximale Benutzer: {args.users}")
     print(f"Schrittgröße: {args.step_size}")
     print(f"Testdauer pro Schritt: {args.test_duration/60:.1f} Minuten")
-    print(f"Pausenzeiten: {args.pause_min}-{args.pause_max} Sekunden")
+    if personas:
+        print("Personas: " + ", ".join(f"{persona.name} ({persona.weight:g})" for persona in personas))
+    else:
+        print(f"Pausenzeiten: {args.pause_min}-{args.pause_max} Sekunden")
     print(f"Host: {base_url}")
+    if args.sweep:
+        print(f"Parameter-Sweep: {len(sweep_plan)} Kombinationen")
+    if args.seed is not None:
+        print(f"Workload-Seed: {args.seed}")
+    if prefix_config:
+        print(f"Shared Prefix: {prefix_config.count} Präfixe à ~{prefix_config.tokens} Tokens, "
+              f"Wiederverwendung {prefix_config.reuse * 100:.0f}%")
+    
+    # Dauertest mit fester Last statt schrittweiser Erhöhung
+    if args.soak is not None:
+        if len(models) != 1 or len(workloads) != 1:
+            print("Fehler: Der Dauertest unterstützt genau ein Modell und einen Workload!")
+            return
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        clean_model = models[0].replace('/', '_').replace(':', '_')
+        soak_output = args.soak_output or f"ollama_soak_{clean_model}_{timestamp}.csv"
+        print(f"Start: {datetime.now().strftime('%H:%M:%S')}")
+        result = run_soak_test(
+            models[0], prompts, args.users, args.pause_min, args.pause_max,
+            args.soak * 3600, base_url, args.gpu, sweep_plan[0], args.seed, workloads[0],
+            args.monitor_interval, personas, prefix_config, args.refresh, args.quiet, args.request_log,
+            args.snapshot_interval, args.soak_baseline, args.drift_threshold, args.drift_stop, soak_output,
+            timeouts, abort_thresholds
+        )
+        if result:
+            print_results_table([result])
+            print_system_table([result])
+            print_error_table([result])
+            save_results_to_file([result], args.output or f"ollama_soak_{clean_model}_{timestamp}_summary.csv")
+            if args.report:
+                generate_html_report([result], args.report, args.slo_ttft)
+        print(f"\nDauertest beendet um {datetime.now().strftime('%H:%M:%S')}")
+        return
     
     # Schrittweise Tests durchführen
     results = []
@@ -459,10 +3063,27 @@ def main():
     if args.users not in user_steps:
         user_steps.append(args.users)
     
-    total_steps = len(user_steps) * len(models)
+    # Batch-Größen werden nur für den embed-Workload durchlaufen
+    workload_runs = [(name, size) for name in workloads for size in (batch_sizes if name == "embed" else [1])]
+    steps_per_run = min(args.adaptive, len(user_steps)) if args.adaptive else len(user_steps)
+    total_steps = steps_per_run * len(models) * len(workload_runs) * len(sweep_plan)
+    # Mittlere Denkpause für das Warteschlangenmodell (bei Personas gewichtet)
+    if personas:
+        total_weight = sum(persona.weight for persona in personas)
+        think_time = sum(persona.weight * mean_think_time(persona.think_time, args.pause_min, args.pause_max)
+                         for persona in personas) / total_weight
+    else:
+        think_time = (args.pause_min + args.pause_max) / 2
     estimated_total_time = total_steps * args.test_duration / 60
     
-    print(f"Geplante Schritte: {user_steps}")
+    if args.export_schedule:
+        export_schedule(args.export_schedule, prompts, user_steps, args.seed,
+                        args.pause_min, args.pause_max, args.test_duration, batch_sizes, personas)
+    
+    if args.adaptive:
+        print(f"Adaptive Messung: {steps_per_run} von {len(user_steps)} Schritten {user_steps}")
+    else:
+        print(f"Geplante Schritte: {user_steps}")
     print(f"Geschätzte Gesamtdauer: {estimated_total_time:.1f} Minuten")
     print(f"Start: {datetime.now().strftime('%H:%M:%S')}")
     
@@ -475,26 +3096,70 @@ def main():
             print(f"TESTE MODELL: {model}")
             print(f"{'='*80}")
             
-            for user_count in user_steps:
-                step_counter += 1
-                print(f"\n[Schritt {step_counter}/{total_steps}] Teste {user_count} Benutzer mit {model}...")
-                
-                result = run_load_test(
-                    model, prompts, user_count, 
-                    args.pause_min, args.pause_max, 
-                    args.test_duration, base_url, args.gpu
-                )
+            # Kombinationen mit gleichem geladenen Modell laufen direkt nacheinander
+            for params in sweep_plan:
+                if params:
+                    print(f"\n--- Parameter: {format_params(params)} ---")
                 
-                if result:
-                    results.append(result)
-                
-                # Kurze Pause zwischen Tests
-                if step_counter < total_steps:
-                    print("Pause zwischen Tests (10 Sekunden)...")
-                    time.sleep(10)
+                for workload_name, batch_size in workload_runs:
+                    # Adaptiv: mit dem kleinsten Schritt beginnen, weitere nach Unsicherheit wählen
+                    pending = [user_steps[0]] if args.adaptive else list(user_steps)
+                    run_results = []
+                    attempted = set()
+                    while pending:
+                        user_count = pending.pop(0)
+                        attempted.add(user_count)
+                        step_counter += 1
+                        batch_info = f", Batch {batch_size}" if workload_name == "embed" else ""
+                        print(f"\n[Schritt {step_counter}/{total_steps}] Teste {user_count} Benutzer mit {model} ({workload_name}{batch_info})...")
+                        
+                        result = run_load_test(
+                            model, prompts, user_count, 
+                            args.pause_min, args.pause_max, 
+                            args.test_duration, base_url, args.gpu,
+                            params, args.seed, workload_name, batch_size,
+                            args.monitor_interval, args.monitor_output, personas, prefix_config,
+                            args.refresh, args.quiet, args.request_log, timeouts, abort_thresholds,
+                            abandon_config=abandon_config
+                        )
+                        
+                        if result:
+                            results.append(result)
+                            run_results.append(result)
+                        
+                        # Begrenzt wird über die Versuche, fehlgeschlagene Schritte zählen mit
+                        if args.adaptive and len(attempted) < steps_per_run:
+                            next_step = recommend_next_step(run_results, user_steps, think_time, attempted)
+                            if next_step:
+                                print(f"Nächster Schritt nach Prognose-Unsicherheit: {next_step} Benutzer")
+                            else:
+                                next_step = next((users for users in user_steps if users not in attempted), None)
+                                if next_step:
+                                    print(f"Keine Prognose möglich - nächster Schritt: {next_step} Benutzer")
+                            if next_step:
+                                pending.append(next_step)
+                        
+                        # Kurze Pause zwischen Tests
+                        if step_counter < total_steps:
+                            print("Pause zwischen Tests (10 Sekunden)...")
+                            time.sleep(10)
         
         # Ergebnisse anzeigen
         print_results_table(results)
+        print_sweep_summary(results)
+        print_persona_table(results)
+        print_prefix_table(results)
+        print_latency_breakdown(results)
+        print_system_table(results)
+        print_error_table(results)
+        print_abandon_table(results)
+        print_prompt_table(results, args.top_prompts)
+        print_embedding_table(results)
+        if args.predict or args.adaptive:
+            print_capacity_prediction(results, user_steps, think_time)
+        
+        if args.report and results:
+            generate_html_report(results, args.report, args.slo_ttft)
         
         # CSV-Export falls gewünscht
         if args.output:
@@ -508,6 +3173,9 @@ def main():
             filename = f"ollama_load_test_{models_str}_{timestamp}.csv"
             save_results_to_file(results, filename)
         
+        if args.prompt_stats_output:
+            save_prompt_stats(results, args.prompt_stats_output)
+        
         print(f"\nLoad Test abgeschlossen um {datetime.now().strftime('%H:%M:%S')}")
         
     except KeyboardInterrupt:
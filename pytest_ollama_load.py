@@ -0,0 +1,163 @@
+"""pytest-Plugin für Performance-Checks mit ollama_load_test
+
+Aktivierung in der conftest.py der eigenen Test-Suite:
+
+    pytest_plugins = ["pytest_ollama_load"]
+
+Ohne --ollama-host laufen die Szenarien gegen einen eingebauten Mock-Server.
+"""
+import json
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from ollama_load_test import LoadTestConfig, LoadTestRunner, Timeouts
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    """Minimaler Ollama-Endpunkt mit Streaming und Timing-Feldern"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_GET(self):
+        self.send_json({"models": [{"name": "mock"}]})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+
+        if self.path == "/api/embed":
+            inputs = request.get("input")
+            inputs = inputs if isinstance(inputs, list) else [inputs]
+            time.sleep(server.ttft)
+            self.send_json({"model": request.get("model"), "embeddings": [[0.0] * 8 for _ in inputs],
+                            "total_duration": int(server.ttft * 1e9), "prompt_eval_count": 5 * len(inputs)})
+            return
+
+        openai = self.path.startswith("/v1/")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream" if openai else "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        start = time.time()
+        time.sleep(server.ttft)
+        prompt_eval = time.time() - start
+        try:
+            for _ in range(server.tokens):
+                if openai:
+                    self.send_chunk(b"data: " + json.dumps({"choices": [{"delta": {"content": "tok "}}]}).encode() + b"\n\n")
+                elif self.path == "/api/chat":
+                    self.send_chunk(json.dumps({"message": {"role": "assistant", "content": "tok "}, "done": False}).encode() + b"\n")
+                else:
+                    self.send_chunk(json.dumps({"response": "tok ", "done": False}).encode() + b"\n")
+                time.sleep(server.token_delay)
+
+            if openai:
+                usage = {"prompt_tokens": 10, "completion_tokens": server.tokens}
+                self.send_chunk(b"data: " + json.dumps({"choices": [], "usage": usage}).encode() + b"\n\n")
+                self.send_chunk(b"data: [DONE]\n\n")
+            else:
+                total = time.time() - start
+                final = {"done": True, "total_duration": int(total * 1e9), "load_duration": 0,
+                         "prompt_eval_count": 10, "prompt_eval_duration": int(prompt_eval * 1e9),
+                         "eval_count": server.tokens, "eval_duration": int((total - prompt_eval) * 1e9)}
+                if self.path == "/api/chat":
+                    final["message"] = {"role": "assistant", "content": ""}
+                else:
+                    final["response"] = ""
+                self.send_chunk(json.dumps(final).encode() + b"\n")
+            self.send_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+class MockOllamaServer(ThreadingHTTPServer):
+    """Mock-Server in einem Hintergrund-Thread (Port 0 = freier Port)"""
+    daemon_threads = True
+
+    def __init__(self, ttft=0.05, token_delay=0.01, tokens=8, port=0):
+        super().__init__(("127.0.0.1", port), MockOllamaHandler)
+        self.ttft = ttft
+        self.token_delay = token_delay
+        self.tokens = tokens
+        self.thread = None
+
+    @property
+    def host(self):
+        return f"127.0.0.1:{self.server_address[1]}"
+
+    def handle_error(self, request, client_address):
+        # Verbindungsabbrüche durch beendete Benutzer-Prozesse sind erwartet
+        pass
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+def pytest_addoption(parser):
+    group = parser.getgroup("ollama-load", "Ollama Load-Tests")
+    group.addoption("--ollama-host", default=os.environ.get("OLLAMA_LOAD_HOST"),
+                    help="Ollama-Server für Load-Szenarien (Standard: eingebauter Mock-Server)")
+    group.addoption("--ollama-model", default=os.environ.get("OLLAMA_LOAD_MODEL", "mock"),
+                    help="Modell für Load-Szenarien")
+
+@pytest.fixture(scope="session")
+def ollama_mock_server():
+    """Gestarteter Mock-Server für die gesamte Test-Session"""
+    server = MockOllamaServer().start()
+    yield server
+    server.stop()
+
+@pytest.fixture(scope="session")
+def ollama_host(request):
+    """Host aus --ollama-host oder der des Mock-Servers"""
+    host = request.config.getoption("--ollama-host")
+    if host:
+        return host
+    return request.getfixturevalue("ollama_mock_server").host
+
+@pytest.fixture
+def ollama_load(request, ollama_host):
+    """Fabrik für kurze Load-Szenarien, liefert ein TestResult
+
+        result = ollama_load(users=4, test_duration=10)
+        assert result.ttft_histogram.percentile(95) < 2.0
+    """
+    def run(prompts=None, on_update=None, **overrides):
+        settings = {
+            "model": request.config.getoption("--ollama-model"),
+            "prompts": prompts or ["Sag Hallo.", "Nenne drei Farben.", "Was ist 2+2?"],
+            "users": 2,
+            "test_duration": 10,
+            "pause_min": 0.1,
+            "pause_max": 0.5,
+            "host": ollama_host,
+            "timeouts": Timeouts(connect=5, ttft=30, stall=30),
+        }
+        settings.update(overrides)
+        result = LoadTestRunner(LoadTestConfig(**settings), on_update=on_update).run()
+        assert result is not None, "Keine Requests im Load-Szenario"
+        return result
+    return run
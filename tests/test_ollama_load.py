@@ -0,0 +1,100 @@
+"""Tests für ollama_load_test: reine Hilfsfunktionen und kurze Szenarien gegen den Mock-Server"""
+import socket
+
+import pytest
+import requests
+
+from ollama_load_test import (LatencyHistogram, RequestPhaseError, Timeouts, check_workload_params,
+                              classify_exception, closed_network_metrics, limit_schedule,
+                              parse_sweep_matrix, summarize_prefix_cohorts)
+from pytest_ollama_load import MockOllamaServer
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram.from_values([i / 100 for i in range(1, 101)])
+    assert histogram.count == 100
+    assert histogram.percentile(50) == pytest.approx(0.5, rel=0.13)
+    assert histogram.percentile(95) == pytest.approx(0.95, rel=0.13)
+    assert histogram.percentile(100) == 1.0
+
+def test_histogram_merge():
+    left = LatencyHistogram.from_values([0.1, 0.2])
+    right = LatencyHistogram.from_values([5.0])
+    left.merge(right)
+    assert left.count == 3
+    assert left.min == 0.1 and left.max == 5.0
+
+def test_classify_exception():
+    timeouts = Timeouts()
+    assert classify_exception(RequestPhaseError("truncated"), timeouts, 1.0, True) == "truncated"
+    assert classify_exception(requests.exceptions.ConnectTimeout(), timeouts, 1.0, False) == "connect_timeout"
+    assert classify_exception(requests.exceptions.ReadTimeout(), timeouts, 1.0, False) == "ttft_timeout"
+    assert classify_exception(requests.exceptions.ReadTimeout(), timeouts, 1.0, True) == "stall"
+    assert classify_exception(requests.exceptions.ReadTimeout(), Timeouts(total=5), 6.0, True) == "deadline"
+    refused = requests.exceptions.ConnectionError(ConnectionRefusedError())
+    assert classify_exception(refused, timeouts, 0.0, False) == "connect_refused"
+    assert classify_exception(socket.timeout(), timeouts, 1.0, False) == "ttft_timeout"
+
+def test_parse_sweep_matrix():
+    matrix = parse_sweep_matrix("num_ctx=2048,4096; temperature=0.5; keep_alive=-1,30m")
+    assert matrix == {"num_ctx": [2048, 4096], "temperature": [0.5], "keep_alive": [-1, "30m"]}
+    with pytest.raises(ValueError):
+        parse_sweep_matrix("unbekannt=1")
+    with pytest.raises(ValueError):
+        parse_sweep_matrix("num_ctx=")
+
+def test_check_workload_params():
+    check_workload_params("openai", {"num_predict": [128], "seed": [1]})
+    with pytest.raises(ValueError):
+        check_workload_params("openai", {"num_ctx": [2048]})
+
+def test_closed_network_metrics():
+    # Ein Server mit 1s Servicezeit sättigt bei 1 Request/s
+    throughput, response_time, wait_time = closed_network_metrics(1, 1.0, 1, (1.0, 0.0))
+    assert throughput == pytest.approx(0.5)
+    assert wait_time == pytest.approx(0.0)
+    throughput, response_time, wait_time = closed_network_metrics(50, 1.0, 1, (1.0, 0.0))
+    assert throughput == pytest.approx(1.0, rel=1e-3)
+    assert response_time == pytest.approx(50 / throughput - 1.0)
+    assert wait_time > 40
+
+def test_summarize_prefix_cohorts():
+    events = [("unique", 1.0, 0.5, 100)] * 3 + [("shared", 0.2, 0.05, 10)] * 4 + [("shared", 0.9, 0.5, 100)]
+    cohorts = summarize_prefix_cohorts(events)
+    assert cohorts["unique"]["requests"] == 3
+    assert cohorts["shared_hit"]["requests"] == 4
+    assert cohorts["shared_miss"]["requests"] == 1
+    # Ohne Miss-Kohorte entscheidet die halbe Präfix-Länge
+    cohorts = summarize_prefix_cohorts([("shared", 0.2, 0.05, 10), ("shared", 0.9, 0.5, 300)], prefix_tokens=400)
+    assert cohorts["shared_hit"]["requests"] == 1
+    assert cohorts["shared_miss"]["requests"] == 1
+
+def test_limit_schedule():
+    schedule = iter([([0], 1.0)] * 100)
+    assert len(list(limit_schedule(schedule, 10))) == 10
+
+def test_load_scenario(ollama_load):
+    result = ollama_load(users=2, test_duration=4)
+    assert result.successful_requests > 0
+    assert result.error_breakdown == {}
+    assert result.ttft_histogram.count == result.successful_requests
+    assert 0 < result.ttft_histogram.percentile(50) <= result.ttft_histogram.percentile(95) < 2.0
+    assert result.latency_histogram.percentile(95) >= result.ttft_histogram.percentile(95)
+
+@pytest.mark.parametrize("workload", ["chat", "openai", "embed"])
+def test_workloads(ollama_load, workload):
+    result = ollama_load(users=2, test_duration=3, workload=workload)
+    assert result.workload == workload
+    assert result.successful_requests > 0
+    assert result.error_rate == 0
+
+def test_ttft_timeouts_are_classified(ollama_load):
+    server = MockOllamaServer(ttft=0.5).start()
+    try:
+        result = ollama_load(users=2, test_duration=3, host=server.host,
+                             timeouts=Timeouts(connect=5, ttft=0.1, stall=30))
+    finally:
+        server.stop()
+    assert result.successful_requests == 0
+    assert set(result.error_breakdown) == {"ttft_timeout"}
+    assert result.error_rates["ttft_timeout"] == 100.0
+    assert result.ttft_histogram.count == 0